@@ -198,9 +198,9 @@ async def get_bot_status():
     """Estado del bot de trading."""
     try:
         from src.execution import AlpacaExecutor
-        executor = AlpacaExecutor()
-        account = executor.get_account()
-        positions = executor.get_positions()
+        with AlpacaExecutor() as executor:
+            account = executor.get_account()
+            positions = executor.get_positions()
         
         return {
             "status": "running",
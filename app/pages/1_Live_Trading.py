@@ -36,14 +36,20 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_executor():
+    """Un solo AlpacaExecutor (y su log SQLite) compartido entre reruns."""
+    from src.execution import AlpacaExecutor
+    return AlpacaExecutor()
+
+
 def main():
     st.title("⚡ Live Trading Dashboard")
     st.markdown("*Alpaca Paper Trading - Real-time monitoring*")
     
     # Check connection
     try:
-        from src.execution import AlpacaExecutor
-        executor = AlpacaExecutor()
+        executor = get_executor()
         connected = True
     except Exception as e:
         st.error(f"❌ Error de conexión: {e}")
@@ -97,7 +97,7 @@ def main():
             slow_period = None
             ml_model_type = st.selectbox(
                 "Modelo ML",
-                options=["random_forest", "gradient_boosting", "xgboost", "lightgbm"],
+                options=["hist_gbm", "random_forest", "gradient_boosting", "xgboost", "lightgbm"],
                 index=0,
             )
             ml_threshold = st.slider(
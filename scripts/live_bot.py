@@ -84,8 +84,9 @@ def run_bot(ticker: str, strategy_type: str, interval_minutes: int):
             latest_exit = signal_result.signals["exits"].iloc[-1]
             
             # Obtener posiciones actuales
-            positions = executor.get_positions()
-            has_position = any(p["symbol"] == ticker for p in positions)
+            positions = {p["symbol"]: p for p in executor.get_positions()}
+            position = positions.get(ticker)
+            has_position = position is not None
             
             # Lógica de ejecución
             if latest_entry and not has_position and last_signal != "entry":
@@ -105,7 +106,7 @@ def run_bot(ticker: str, strategy_type: str, interval_minutes: int):
             elif latest_exit and has_position and last_signal != "exit":
                 # VENDER
                 logger.info(f"🔴 SEÑAL DE VENTA: {ticker}")
-                order = executor.close_position(ticker)
+                order = executor.close_position(ticker, position=position)
                 logger.info(f"   → Orden: {order.status} | ID: {order.order_id}")
                 last_signal = "exit"
             
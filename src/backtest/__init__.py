@@ -1,6 +1,8 @@
 # Backtest layer
-from .engine import BacktestEngine, BacktestResult
+from .engine import BacktestEngine, BacktestResult, PriceArrays
 from .costs import TradingCosts
 from .sizing import calculate_position_size
 
-__all__ = ["BacktestEngine", "BacktestResult", "TradingCosts", "calculate_position_size"]
+__all__ = [
+    "BacktestEngine", "BacktestResult", "PriceArrays", "TradingCosts", "calculate_position_size",
+]
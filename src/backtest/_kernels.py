@@ -0,0 +1,92 @@
+"""Kernels Numba para backtests rápidos de señales long-only.
+
+Simulan lo mismo que `vbt.Portfolio.from_signals` con size=100% del cash,
+comisión y slippage porcentuales y sin stops, para usar dentro de loops de
+optimización donde construir un Portfolio por trial domina el tiempo.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def simulate_signals_nb(
+    price: np.ndarray,
+    close: np.ndarray,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    init_cash: float,
+    fees: float,
+    slippage: float,
+) -> np.ndarray:
+    """
+    Curva de valor del portfolio barra a barra.
+
+    Las señales ya deben venir desplazadas (ejecución en la barra de la señal
+    al precio `price`). Entry con posición abierta, exit sin posición o ambas
+    en la misma barra se ignoran, como en vectorbt.
+    """
+    size = close.shape[0]
+    value = np.empty(size)
+    cash = init_cash
+    shares = 0.0
+    for i in range(size):
+        if entries[i] and not exits[i]:
+            if shares == 0.0 and cash > 0.0:
+                buy_price = price[i] * (1.0 + slippage)
+                shares = cash / (buy_price * (1.0 + fees))
+                cash = 0.0
+        elif exits[i] and not entries[i]:
+            if shares > 0.0:
+                sell_price = price[i] * (1.0 - slippage)
+                cash += shares * sell_price * (1.0 - fees)
+                shares = 0.0
+        value[i] = cash + shares * close[i]
+    return value
+
+
+@njit(cache=True)
+def value_metrics_nb(value: np.ndarray, init_cash: float, ann_factor: float):
+    """
+    Retorno total, Sharpe y Sortino anualizados de una curva de valor.
+
+    Los retornos por barra parten desde init_cash (igual que vectorbt) y los
+    ratios no finitos se devuelven como 0, como en BacktestEngine.
+
+    Returns:
+        Tupla (total_return, sharpe, sortino); total_return como fracción.
+    """
+    size = value.shape[0]
+    if size == 0:
+        return 0.0, 0.0, 0.0
+    returns = np.empty(size)
+    prev = init_cash
+    for i in range(size):
+        returns[i] = value[i] / prev - 1.0
+        prev = value[i]
+
+    total_return = value[-1] / init_cash - 1.0
+    mean = returns.mean()
+
+    sharpe = 0.0
+    if size > 1:
+        std = np.sqrt(((returns - mean) ** 2).sum() / (size - 1))
+        if std > 0.0:
+            sharpe = mean / std * np.sqrt(ann_factor)
+
+    downside = 0.0
+    for i in range(size):
+        if returns[i] < 0.0:
+            downside += returns[i] * returns[i]
+    downside = np.sqrt(downside / size)
+    sortino = 0.0
+    if downside > 0.0:
+        sortino = mean / downside * np.sqrt(ann_factor)
+
+    if not np.isfinite(sharpe):
+        sharpe = 0.0
+    if not np.isfinite(sortino):
+        sortino = 0.0
+    if not np.isfinite(total_return):
+        total_return = 0.0
+    return total_return, sharpe, sortino
@@ -7,9 +7,28 @@ import numpy as np
 import pandas as pd
 import vectorbt as vbt
 
+from vectorbt.utils.datetime_ import freq_to_timedelta
+
+from ._kernels import simulate_signals_nb, value_metrics_nb
 from .costs import TradingCosts
 
 
+def _infer_freq(index: pd.Index) -> str:
+    """Frecuencia del índice como string para vectorbt (default '1D')."""
+    freq = pd.infer_freq(index) if len(index) >= 3 else None
+    if freq is None and len(index) >= 2:
+        # Fallback: calcular delta entre primeras dos barras
+        delta = index[1] - index[0]
+        # Convertir a string para vectorbt
+        if delta.days >= 1:
+            freq = f"{delta.days}D"
+        elif delta.seconds >= 3600:
+            freq = f"{delta.seconds // 3600}H"
+        else:
+            freq = f"{delta.seconds // 60}T"
+    return freq or "1D"
+
+
 @dataclass
 class BacktestResult:
     """
@@ -39,6 +58,37 @@ class BacktestResult:
         return len(self.trades)
 
 
+@dataclass(frozen=True)
+class PriceArrays:
+    """
+    Precios ya convertidos para `BacktestEngine.quick_metrics`.
+
+    Attributes:
+        exec_price: Precio de ejecución (open, o close si no hay open).
+        close: Precio de cierre para valorizar la posición.
+        ann_factor: Barras por año según la frecuencia del índice.
+    """
+
+    exec_price: np.ndarray
+    close: np.ndarray
+    ann_factor: float
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame) -> "PriceArrays":
+        """Convierte un DataFrame OHLCV (una vez) para reutilizarlo entre backtests."""
+        close = prices["close"].to_numpy(dtype=np.float64)
+        exec_price = (
+            prices["open"].to_numpy(dtype=np.float64) if "open" in prices.columns else close
+        )
+        try:
+            bar = freq_to_timedelta(_infer_freq(prices.index))
+        except ValueError:
+            # Frecuencias de calendario ('B', 'W-SUN'...) no son un Timedelta
+            bar = prices.index[1] - prices.index[0] if len(prices) >= 2 else pd.Timedelta("1D")
+        ann_factor = pd.Timedelta(vbt.settings.returns["year_freq"]) / bar
+        return cls(exec_price=exec_price, close=close, ann_factor=ann_factor)
+
+
 class BacktestEngine:
     """
     Motor de backtesting wrapper de vectorbt.
@@ -111,18 +161,7 @@ class BacktestEngine:
         tp_stop = tp_pct if tp_pct is not None else None
 
         # Inferir frecuencia dinámicamente del índice
-        freq = pd.infer_freq(prices.index)
-        if freq is None and len(prices.index) >= 2:
-            # Fallback: calcular delta entre primeras dos barras
-            delta = prices.index[1] - prices.index[0]
-            # Convertir a string para vectorbt
-            if delta.days >= 1:
-                freq = f"{delta.days}D"
-            elif delta.seconds >= 3600:
-                freq = f"{delta.seconds // 3600}H"
-            else:
-                freq = f"{delta.seconds // 60}T"
-        freq = freq or "1D"
+        freq = _infer_freq(prices.index)
 
         # Crear portfolio con vectorbt
         # NOTA: price= define el precio de ejecución de órdenes
@@ -165,6 +204,68 @@ class BacktestEngine:
             portfolio=portfolio,
         )
 
+    def quick_metrics(
+        self,
+        prices: pd.DataFrame,
+        signals: pd.DataFrame,
+        execution_delay: int = 1,
+        arrays: "PriceArrays | None" = None,
+    ) -> dict:
+        """
+        Retorno, Sharpe y Sortino sin construir un Portfolio de vectorbt.
+
+        Simula en Numba el mismo caso que `run` con size_pct=1.0 y sin
+        SL/TP. Pensado para loops de optimización (un trial de Optuna); para
+        reportes usar `run`, que entrega trades, equity y stats completos.
+
+        Args:
+            prices: DataFrame OHLCV.
+            signals: DataFrame con columnas 'entries' y 'exits' (bool).
+            execution_delay: Delay en barras para ejecución (1 = t→t+1).
+            arrays: `PriceArrays.from_prices(prices)` precalculado, para no
+                repetir conversiones ni la inferencia de frecuencia cuando se
+                evalúan muchas señales sobre los mismos precios. Las señales
+                deben venir alineadas con `prices`.
+
+        Returns:
+            Dict con total_return_pct, sharpe_ratio y sortino_ratio.
+        """
+        if prices.empty:
+            raise ValueError("prices DataFrame is empty")
+        if signals.empty:
+            raise ValueError("signals DataFrame is empty")
+
+        if arrays is None:
+            # Alinear índices
+            if not prices.index.equals(signals.index):
+                common_idx = prices.index.intersection(signals.index)
+                prices = prices.loc[common_idx]
+                signals = signals.loc[common_idx]
+            arrays = PriceArrays.from_prices(prices)
+        elif len(signals) != len(arrays.close):
+            raise ValueError("signals must be aligned with the precomputed price arrays")
+
+        # Señal en t → ejecución en t+delay
+        entries = np.zeros(len(signals), dtype=np.bool_)
+        exits = np.zeros(len(signals), dtype=np.bool_)
+        if execution_delay < len(signals):
+            end = len(signals) - execution_delay
+            entries[execution_delay:] = signals["entries"].to_numpy(dtype=np.bool_)[:end]
+            exits[execution_delay:] = signals["exits"].to_numpy(dtype=np.bool_)[:end]
+
+        value = simulate_signals_nb(
+            arrays.exec_price, arrays.close, entries, exits, self.initial_capital,
+            self.costs.commission_pct, self.costs.slippage_pct,
+        )
+        total_return, sharpe, sortino = value_metrics_nb(
+            value, self.initial_capital, arrays.ann_factor
+        )
+        return {
+            "total_return_pct": total_return * 100,
+            "sharpe_ratio": sharpe,
+            "sortino_ratio": sortino,
+        }
+
     def _extract_trades(self, portfolio) -> pd.DataFrame:
         """Extrae tabla de trades del portfolio."""
         try:
@@ -56,24 +56,26 @@ class CacheManager:
         age = datetime.now() - mtime
         return age < timedelta(hours=self.max_age_hours)
 
-    def save_to_cache(self, df: pd.DataFrame, path: Path) -> None:
+    def save_to_cache(self, df: pd.DataFrame, path: Path, engine: str = "pyarrow") -> None:
         """
         Guarda un DataFrame en caché como Parquet.
 
         Args:
             df: DataFrame con datos OHLCV.
             path: Path donde guardar el archivo.
+            engine: Motor Parquet de pandas ('pyarrow' o 'fastparquet').
         """
         # Asegurar que el directorio existe
         path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_parquet(path, engine="pyarrow")
+        df.to_parquet(path, engine=engine)
 
-    def load_from_cache(self, path: Path) -> pd.DataFrame:
+    def load_from_cache(self, path: Path, engine: str = "pyarrow") -> pd.DataFrame:
         """
         Carga un DataFrame desde caché.
 
         Args:
             path: Path al archivo parquet.
+            engine: Motor Parquet de pandas ('pyarrow' o 'fastparquet').
 
         Returns:
             DataFrame con datos OHLCV.
@@ -83,7 +85,7 @@ class CacheManager:
         """
         if not path.exists():
             raise FileNotFoundError(f"Cache file not found: {path}")
-        return pd.read_parquet(path, engine="pyarrow")
+        return pd.read_parquet(path, engine=engine)
 
     def clear_cache(self, ticker: str | None = None, timeframe: str | None = None) -> int:
         """
@@ -1,5 +1,8 @@
 """DataLoader para descarga y carga de datos de precios."""
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
@@ -41,6 +44,12 @@ class DataLoader:
         "1h": 730,    # 2 años
     }
 
+    OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+    # Caché en memoria: evita re-stat/re-leer parquet en lookups repetidos
+    MEM_CACHE_TTL_SECONDS = 60
+    MEM_CACHE_MAX_ENTRIES = 32
+
     def __init__(
         self,
         cache_dir: Path | str = "data/raw",
@@ -55,6 +64,8 @@ class DataLoader:
         """
         self.cache = CacheManager(cache_dir, cache_max_age_hours)
         self.source = source
+        self._mem_cache: OrderedDict[tuple[str, str], tuple[float, pd.DataFrame]] = OrderedDict()
+        self._mem_lock = threading.RLock()
 
     def load(
         self,
@@ -86,11 +97,22 @@ class DataLoader:
                 f"Valid options: {list(self.TIMEFRAME_MAP.keys())}"
             )
 
+        mem_key = (ticker.upper(), timeframe)
+
+        # Intentar caché en memoria (sin I/O de disco)
+        if use_cache:
+            df = self._get_from_mem_cache(mem_key)
+            if df is not None:
+                df = self._filter_by_dates(df, start, end)
+                metadata = self._create_metadata(ticker, timeframe, df)
+                return df, metadata
+
         cache_path = self.cache.get_cache_path(ticker, timeframe)
 
         # Intentar cargar desde caché
         if use_cache and self.cache.is_cache_valid(cache_path):
             df = self.cache.load_from_cache(cache_path)
+            self._put_in_mem_cache(mem_key, df)
             # Filtrar por fechas si se especifican
             df = self._filter_by_dates(df, start, end)
             metadata = self._create_metadata(ticker, timeframe, df)
@@ -102,6 +124,7 @@ class DataLoader:
         # Guardar en caché (datos completos, sin filtrar)
         if use_cache and not df.empty:
             self.cache.save_to_cache(df, cache_path)
+            self._put_in_mem_cache(mem_key, df)
 
         # Filtrar por fechas para retornar
         df = self._filter_by_dates(df, start, end)
@@ -109,6 +132,55 @@ class DataLoader:
 
         return df, metadata
 
+    def clear_cache(self, ticker: str | None = None, timeframe: str | None = None) -> int:
+        """
+        Limpia el caché en disco y las copias en memoria correspondientes.
+
+        Usar en vez de `self.cache.clear_cache`: limpiar solo el disco deja
+        las copias en memoria (hasta MEM_CACHE_TTL_SECONDS) y un load()
+        posterior devolvería datos viejos.
+
+        Args:
+            ticker: Si se especifica, solo limpia ese ticker.
+            timeframe: Si se especifica, solo limpia ese timeframe.
+
+        Returns:
+            Número de archivos eliminados del disco.
+        """
+        with self._mem_lock:
+            for key in list(self._mem_cache):
+                key_ticker, key_tf = key
+                if ticker and key_ticker != ticker.upper():
+                    continue
+                if timeframe and key_tf != timeframe:
+                    continue
+                del self._mem_cache[key]
+        return self.cache.clear_cache(ticker, timeframe)
+
+    def _get_from_mem_cache(self, key: tuple[str, str]) -> pd.DataFrame | None:
+        """Retorna el DataFrame en memoria si existe y no expiró."""
+        with self._mem_lock:
+            entry = self._mem_cache.get(key)
+            if entry is None:
+                return None
+
+            stored_at, df = entry
+            if time.monotonic() - stored_at >= self.MEM_CACHE_TTL_SECONDS:
+                del self._mem_cache[key]
+                return None
+
+            self._mem_cache.move_to_end(key)
+        # Copia superficial: el caller puede agregar columnas sin tocar el caché
+        return df.copy(deep=False)
+
+    def _put_in_mem_cache(self, key: tuple[str, str], df: pd.DataFrame) -> None:
+        """Guarda un DataFrame en memoria, descartando el más antiguo si se llena."""
+        with self._mem_lock:
+            self._mem_cache[key] = (time.monotonic(), df.copy(deep=False))
+            self._mem_cache.move_to_end(key)
+            while len(self._mem_cache) > self.MEM_CACHE_MAX_ENTRIES:
+                self._mem_cache.popitem(last=False)
+
     def _download_from_yfinance(
         self,
         ticker: str,
@@ -141,12 +213,13 @@ class DataLoader:
         if df.empty:
             return pd.DataFrame()
 
-        # Normalizar nombres de columnas a minúsculas
-        df.columns = df.columns.str.lower()
+        # Normalizar nombres de columnas a minúsculas (in place, sin reconstruir Index)
+        df.rename(columns=str.lower, inplace=True)
 
-        # Mantener solo OHLCV
-        ohlcv_cols = ["open", "high", "low", "close", "volume"]
-        df = df[[c for c in ohlcv_cols if c in df.columns]]
+        # Mantener solo OHLCV (una única selección sobre el frame descargado)
+        keep = [c for c in self.OHLCV_COLUMNS if c in df.columns]
+        if keep != list(df.columns):
+            df = df[keep]
 
         # Asegurar que el índice tiene nombre
         df.index.name = "timestamp"
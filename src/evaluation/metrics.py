@@ -4,8 +4,13 @@ import numpy as np
 import pandas as pd
 
 
+def _to_float_array(values: pd.Series | np.ndarray) -> np.ndarray:
+    """Convierte Series/array a ndarray float64 contiguo sin pasar por pandas."""
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
 def calculate_sharpe(
-    returns: pd.Series,
+    returns: pd.Series | np.ndarray,
     rf: float = 0.0,
     periods_per_year: int = 252,
 ) -> float:
@@ -23,20 +28,33 @@ def calculate_sharpe(
     Returns:
         Sharpe ratio anualizado.
     """
-    if returns.empty or returns.std() == 0:
+    values = _to_float_array(returns)
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n < 2:
+        return 0.0
+
+    # Suma y suma de cuadrados en una sola pasada (sin Series intermedias).
+    # Restar rf constante no cambia la varianza, solo desplaza la media.
+    total = values.sum()
+    total_sq = np.dot(values, values)
+    mean = total / n
+    var = (total_sq - total * mean) / (n - 1)  # ddof=1, igual que pandas
+
+    # Tolerancia relativa: retornos constantes dejan residuo de redondeo
+    if var <= 1e-12 * total_sq / n:
         return 0.0
 
     # Convertir rf a período
     rf_per_period = rf / periods_per_year
 
-    excess_returns = returns - rf_per_period
-    sharpe = excess_returns.mean() / excess_returns.std()
+    sharpe = (mean - rf_per_period) / np.sqrt(var)
 
     # Anualizar
-    return sharpe * np.sqrt(periods_per_year)
+    return float(sharpe * np.sqrt(periods_per_year))
 
 
-def calculate_max_drawdown(equity: pd.Series) -> float:
+def calculate_max_drawdown(equity: pd.Series | np.ndarray) -> float:
     """
     Calcula maximum drawdown como porcentaje.
     
@@ -46,16 +64,19 @@ def calculate_max_drawdown(equity: pd.Series) -> float:
     Returns:
         Max drawdown como porcentaje negativo (e.g., -15.5).
     """
-    if equity.empty:
+    values = _to_float_array(equity)
+    if values.size < 2 or not np.isfinite(values).any():
         return 0.0
 
-    # Running maximum
-    running_max = equity.expanding().max()
+    # Running maximum (una sola pasada en C, sin overhead de pandas).
+    # fmax ignora NaN (como cummax de pandas); np.maximum lo propagaría
+    running_max = np.fmax.accumulate(values)
 
-    # Drawdown en cada punto
-    drawdown = (equity - running_max) / running_max * 100
+    # Drawdown en cada punto (evitar división por cero si la equity parte en 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(running_max != 0, (values - running_max) / running_max, 0.0)
 
-    return drawdown.min()
+    return float(np.nanmin(drawdown) * 100.0)
 
 
 def calculate_win_rate(trades: pd.DataFrame, pnl_column: str = "pnl") -> float:
@@ -72,8 +93,9 @@ def calculate_win_rate(trades: pd.DataFrame, pnl_column: str = "pnl") -> float:
     if trades.empty or pnl_column not in trades.columns:
         return 0.0
 
-    wins = (trades[pnl_column] > 0).sum()
-    total = len(trades)
+    pnl = trades[pnl_column].to_numpy(dtype=np.float64)
+    wins = np.count_nonzero(pnl > 0)
+    total = pnl.size
 
     return (wins / total) * 100 if total > 0 else 0.0
 
@@ -92,9 +114,10 @@ def calculate_profit_factor(trades: pd.DataFrame, pnl_column: str = "pnl") -> fl
     if trades.empty or pnl_column not in trades.columns:
         return 0.0
 
-    pnl = trades[pnl_column]
-    gross_profits = pnl[pnl > 0].sum()
-    gross_losses = abs(pnl[pnl < 0].sum())
+    # Una pasada por signo sobre el array crudo (fmax/fmin ignoran NaN)
+    pnl = trades[pnl_column].to_numpy(dtype=np.float64)
+    gross_profits = float(np.fmax(pnl, 0.0).sum())
+    gross_losses = float(-np.fmin(pnl, 0.0).sum())
 
     if gross_losses == 0:
         return float("inf") if gross_profits > 0 else 0.0
@@ -103,7 +126,7 @@ def calculate_profit_factor(trades: pd.DataFrame, pnl_column: str = "pnl") -> fl
 
 
 def calculate_cagr(
-    equity: pd.Series,
+    equity: pd.Series | np.ndarray,
     periods_per_year: int = 252,
 ) -> float:
     """
@@ -116,18 +139,19 @@ def calculate_cagr(
     Returns:
         CAGR como porcentaje.
     """
-    if equity.empty or len(equity) < 2:
+    values = _to_float_array(equity)
+    if values.size < 2:
         return 0.0
 
-    total_return = equity.iloc[-1] / equity.iloc[0]
-    n_periods = len(equity)
+    total_return = values[-1] / values[0]
+    n_periods = values.size
     n_years = n_periods / periods_per_year
 
     if n_years <= 0:
         return 0.0
 
     cagr = (total_return ** (1 / n_years) - 1) * 100
-    return cagr
+    return float(cagr)
 
 
 def get_periods_per_year(timeframe: str) -> int:
@@ -154,7 +178,7 @@ def get_periods_per_year(timeframe: str) -> int:
 
 
 def calculate_sortino_ratio(
-    returns: pd.Series,
+    returns: pd.Series | np.ndarray,
     rf: float = 0.0,
     periods_per_year: int = 252,
 ) -> float:
@@ -172,26 +196,32 @@ def calculate_sortino_ratio(
     Returns:
         Sortino ratio anualizado.
     """
-    if returns.empty:
+    values = _to_float_array(returns)
+    values = values[~np.isnan(values)]
+    if values.size < 2:
         return 0.0
     
     rf_per_period = rf / periods_per_year
-    excess_returns = returns - rf_per_period
+    excess_returns = values - rf_per_period
+    mean_excess = excess_returns.mean()
     
     # Solo retornos negativos para downside deviation
     downside_returns = excess_returns[excess_returns < 0]
     
-    if len(downside_returns) == 0 or downside_returns.std() == 0:
-        return float("inf") if excess_returns.mean() > 0 else 0.0
+    if downside_returns.size < 2:
+        return float("inf") if mean_excess > 0 else 0.0
+    
+    downside_std = downside_returns.std(ddof=1)
+    if downside_std == 0:
+        return float("inf") if mean_excess > 0 else 0.0
     
-    downside_std = downside_returns.std()
-    sortino = excess_returns.mean() / downside_std
+    sortino = mean_excess / downside_std
     
-    return sortino * np.sqrt(periods_per_year)
+    return float(sortino * np.sqrt(periods_per_year))
 
 
 def calculate_calmar_ratio(
-    equity: pd.Series,
+    equity: pd.Series | np.ndarray,
     periods_per_year: int = 252,
 ) -> float:
     """
@@ -207,11 +237,12 @@ def calculate_calmar_ratio(
     Returns:
         Calmar ratio. Mayor es mejor.
     """
-    if equity.empty or len(equity) < 2:
+    values = _to_float_array(equity)
+    if values.size < 2:
         return 0.0
     
-    cagr = calculate_cagr(equity, periods_per_year)
-    max_dd = abs(calculate_max_drawdown(equity))
+    cagr = calculate_cagr(values, periods_per_year)
+    max_dd = abs(calculate_max_drawdown(values))
     
     if max_dd == 0:
         return float("inf") if cagr > 0 else 0.0
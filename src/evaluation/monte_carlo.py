@@ -13,6 +13,25 @@ from dataclasses import dataclass
 from typing import List, Tuple
 import numpy as np
 import pandas as pd
+from numba import njit
+
+
+@njit(cache=True)
+def _build_equity_paths(shuffled_returns: np.ndarray, initial_capital: float) -> np.ndarray:
+    """Reconstruye las curvas de capital de cada simulación (kernel compilado).
+
+    Numba compila una especialización por dtype/ndim de los argumentos y la
+    guarda en disco (cache=True), así que solo la primera llamada paga el JIT.
+    """
+    n_sims, n_periods = shuffled_returns.shape
+    paths = np.empty((n_sims, n_periods + 1), dtype=shuffled_returns.dtype)
+    for sim in range(n_sims):
+        equity = initial_capital
+        paths[sim, 0] = equity
+        for t in range(n_periods):
+            equity = equity * (1.0 + shuffled_returns[sim, t])
+            paths[sim, t + 1] = equity
+    return paths
 
 
 @dataclass
@@ -76,14 +95,20 @@ class MonteCarloSimulator:
         self,
         n_simulations: int = 1000,
         random_seed: int = 42,
+        precompile: bool = False,
     ):
         """
         Args:
             n_simulations: Número de simulaciones a ejecutar.
             random_seed: Semilla para reproducibilidad.
+            precompile: Si compilar el kernel Numba al construir el simulador,
+                para que el primer simulate() (e.g., click en la UI) no pague el JIT.
         """
         self.n_simulations = n_simulations
         self.random_seed = random_seed
+
+        if precompile:
+            _build_equity_paths(np.zeros((1, 1), dtype=np.float64), 1.0)
     
     def simulate(
         self,
@@ -104,37 +129,31 @@ class MonteCarloSimulator:
         
         if isinstance(returns, pd.Series):
             returns = returns.dropna().values
+        returns = np.asarray(returns, dtype=np.float64)
         
         n_periods = len(returns)
         
         if n_periods < 10:
             raise ValueError("Se necesitan al menos 10 retornos para Monte Carlo")
         
-        # Generar paths simulados
-        equity_paths = np.zeros((self.n_simulations, n_periods + 1))
-        equity_paths[:, 0] = initial_capital
-        
+        # Shuffle de retornos (mismo stream aleatorio que antes para reproducibilidad)
+        shuffled_returns = np.empty((self.n_simulations, n_periods))
         for sim in range(self.n_simulations):
-            # Shuffle de retornos
-            shuffled_returns = np.random.permutation(returns)
-            
-            # Reconstruir equity
-            for t in range(n_periods):
-                equity_paths[sim, t + 1] = equity_paths[sim, t] * (1 + shuffled_returns[t])
+            shuffled_returns[sim] = np.random.permutation(returns)
+        
+        # Reconstruir equity de todos los paths en el kernel compilado
+        equity_paths = _build_equity_paths(shuffled_returns, float(initial_capital))
         
         # Calcular retornos finales
         final_equities = equity_paths[:, -1]
         final_returns = (final_equities / initial_capital) - 1
         
-        # Calcular drawdowns para cada path
-        max_drawdowns = []
-        for sim in range(self.n_simulations):
-            path = equity_paths[sim]
-            running_max = np.maximum.accumulate(path)
-            drawdowns = (path - running_max) / running_max
-            max_drawdowns.append(drawdowns.min())
-        
-        max_drawdowns = np.array(max_drawdowns)
+        # Calcular drawdowns de todos los paths a la vez:
+        # min(path / running_max) - 1, reutilizando el buffer de running_max.
+        # equity_paths se conserva intacto (lo usa el fan chart).
+        ratios = np.maximum.accumulate(equity_paths, axis=1)
+        np.divide(equity_paths, ratios, out=ratios)
+        max_drawdowns = ratios.min(axis=1) - 1.0
         
         # Estadísticas
         mean_final = np.mean(final_returns)
@@ -7,12 +7,21 @@ Ejemplo de uso:
     pdf_bytes = generator.generate(backtest_result, metadata)
     with open("report.pdf", "wb") as f:
         f.write(pdf_bytes)
+
+    # O directo a disco, sin pasar por memoria:
+    generator.generate(backtest_result, metadata, sink="report.pdf")
 """
 
 import io
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from itertools import repeat, zip_longest
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Any, List, Optional, Tuple, Union
 
+import numpy as np
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -23,9 +32,194 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
-from ..backtest.engine import BacktestResult
 from ..data.schemas import DataMetadata
 
+if TYPE_CHECKING:
+    # Solo para type hints: importar engine arrastra vectorbt (~2s de import)
+    from ..backtest.engine import BacktestResult
+
+
+# Paleta del reporte (parseada una sola vez)
+_C_TITLE = colors.HexColor('#1a1a2e')
+_C_SUBTITLE = colors.HexColor('#666666')
+_C_HEADER = colors.HexColor('#16213e')
+_C_ACCENT = colors.HexColor('#0f4c75')
+_C_GREY_TEXT = colors.HexColor('#888888')
+_C_GREY_BORDER = colors.HexColor('#e0e0e0')
+
+# Estilos de tabla (inmutables tras setStyle, se comparten entre reportes)
+_KEY_METRICS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 16),
+    ('FONTSIZE', (0, 2), (-1, 2), 16),
+    ('FONTSIZE', (0, 1), (-1, 1), 9),
+    ('FONTSIZE', (0, 3), (-1, 3), 9),
+    ('TEXTCOLOR', (0, 0), (-1, 0), _C_ACCENT),
+    ('TEXTCOLOR', (0, 2), (-1, 2), _C_ACCENT),
+    ('TEXTCOLOR', (0, 1), (-1, 1), _C_GREY_TEXT),
+    ('TEXTCOLOR', (0, 3), (-1, 3), _C_GREY_TEXT),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+])
+
+_STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), _C_HEADER),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, _C_GREY_BORDER),
+])
+
+_TRADES_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('LINEBELOW', (0, 0), (-1, -2), 0.5, _C_GREY_BORDER),
+])
+
+_PARAMS_TABLE_STYLE = TableStyle([
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+])
+
+# Specs de métricas: (label, clave en stats, default, template, conversión).
+# Tablas fijas a nivel de módulo en vez de ~20 f-strings armados por reporte.
+_KEY_METRICS_SPEC = (
+    ("Total Return", "total_return_pct", 0, "{:.2f}%", float),
+    ("Sharpe Ratio", "sharpe_ratio", 0, "{:.2f}", float),
+    ("Max Drawdown", "max_drawdown_pct", 0, "{:.2f}%", float),
+    ("Win Rate", "win_rate_pct", 0, "{:.1f}%", float),
+    ("Profit Factor", "profit_factor", 0, "{:.2f}", float),
+    ("Avg Trade", "avg_trade_pct", 0, "{:.2f}%", float),
+    ("Total Trades", "num_trades", 0, "{:d}", int),
+    ("Sortino Ratio", "sortino_ratio", 0, "{:.2f}", float),
+)
+
+_LEFT_STATS_SPEC = (
+    ("Initial Capital", "initial_capital", 10000, "${:,.2f}", float),
+    ("Final Equity", "final_equity", 10000, "${:,.2f}", float),
+    ("Total Return", "total_return_pct", 0, "{:.2f}%", float),
+    ("Annual Return", "annual_return_pct", 0, "{:.2f}%", float),
+    ("Max Drawdown", "max_drawdown_pct", 0, "{:.2f}%", float),
+)
+
+_RIGHT_STATS_SPEC = (
+    ("Sharpe Ratio", "sharpe_ratio", 0, "{:.3f}", float),
+    ("Sortino Ratio", "sortino_ratio", 0, "{:.3f}", float),
+    ("Calmar Ratio", "calmar_ratio", 0, "{:.3f}", float),
+    ("Win Rate", "win_rate_pct", 0, "{:.1f}%", float),
+    ("Profit Factor", "profit_factor", 0, "{:.2f}", float),
+)
+
+
+def _format_stats(stats: Dict[str, Any], spec: tuple) -> List[Tuple[str, str]]:
+    """Formatea stats según una spec de métricas en una sola pasada."""
+    return [
+        (label, template.format(cast(stats.get(key, default))))
+        for label, key, default, template, cast in spec
+    ]
+
+
+@lru_cache(maxsize=1)
+def _get_stylesheet():
+    """
+    Construye (una sola vez por proceso) el stylesheet base + estilos custom.
+    
+    getSampleStyleSheet() reconstruye todos los ParagraphStyle en cada llamada;
+    como los estilos no se modifican después, todas las instancias comparten este.
+    """
+    styles = getSampleStyleSheet()
+    
+    # Título principal
+    styles.add(ParagraphStyle(
+        name='MainTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=_C_TITLE,
+        spaceAfter=6,
+        alignment=TA_CENTER,
+    ))
+    
+    # Subtítulo
+    styles.add(ParagraphStyle(
+        name='Subtitle',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=_C_SUBTITLE,
+        spaceAfter=20,
+        alignment=TA_CENTER,
+    ))
+    
+    # Sección header
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=_C_HEADER,
+        spaceBefore=15,
+        spaceAfter=10,
+        borderPadding=5,
+    ))
+    
+    # Métrica grande
+    styles.add(ParagraphStyle(
+        name='MetricValue',
+        parent=styles['Normal'],
+        fontSize=20,
+        textColor=_C_ACCENT,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+    ))
+    
+    # Métrica label
+    styles.add(ParagraphStyle(
+        name='MetricLabel',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=_C_GREY_TEXT,
+        alignment=TA_CENTER,
+    ))
+    
+    # Footer
+    styles.add(ParagraphStyle(
+        name='Footer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=_C_GREY_TEXT,
+        alignment=TA_CENTER,
+    ))
+    
+    return styles
+
+
+# Un job de generate_many: (result, metadata, strategy_name, strategy_params)
+ReportJob = Tuple["BacktestResult", Optional[DataMetadata], str, Optional[Dict[str, Any]]]
+
+# Generador por proceso worker (creado por _init_worker)
+_worker_generator: "AlphaReportGenerator | None" = None
+
+
+def _init_worker(title: str, subtitle: str) -> None:
+    """Crea un generador por proceso para no reconstruirlo en cada job."""
+    global _worker_generator
+    _worker_generator = AlphaReportGenerator(title=title, subtitle=subtitle)
+
+
+def _generate_job(job: ReportJob, generated_at: datetime) -> bytes:
+    """Genera un PDF dentro de un proceso worker."""
+    return _worker_generator.generate(*job, generated_at=generated_at)
+
 
 class AlphaReportGenerator:
     """
@@ -51,81 +245,43 @@ class AlphaReportGenerator:
         """
         self.title = title
         self.subtitle = subtitle
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Configura estilos personalizados."""
-        # Título principal
-        self.styles.add(ParagraphStyle(
-            name='MainTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a1a2e'),
-            spaceAfter=6,
-            alignment=TA_CENTER,
-        ))
-        
-        # Subtítulo
-        self.styles.add(ParagraphStyle(
-            name='Subtitle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#666666'),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-        ))
-        
-        # Sección header
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#16213e'),
-            spaceBefore=15,
-            spaceAfter=10,
-            borderPadding=5,
-        ))
-        
-        # Métrica grande
-        self.styles.add(ParagraphStyle(
-            name='MetricValue',
-            parent=self.styles['Normal'],
-            fontSize=20,
-            textColor=colors.HexColor('#0f4c75'),
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-        ))
-        
-        # Métrica label
-        self.styles.add(ParagraphStyle(
-            name='MetricLabel',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#888888'),
-            alignment=TA_CENTER,
-        ))
+        self.styles = _get_stylesheet()
     
     def generate(
         self,
-        result: BacktestResult,
+        result: "BacktestResult",
         metadata: Optional[DataMetadata] = None,
         strategy_name: str = "Strategy",
         strategy_params: Optional[Dict[str, Any]] = None,
-    ) -> bytes:
+        *,
+        sink: Optional[Union[str, Path, BinaryIO]] = None,
+        generated_at: Optional[datetime] = None,
+    ) -> Optional[bytes]:
         """
-        Genera PDF como bytes.
+        Genera PDF como bytes, o lo escribe directo en un archivo.
         
         Args:
             result: Resultado del backtest.
             metadata: Metadata del dataset.
             strategy_name: Nombre de la estrategia.
             strategy_params: Parámetros de la estrategia.
+            sink: Path o archivo binario abierto donde escribir el PDF. Evita
+                materializar el PDF completo en memoria (BytesIO + getvalue).
+            generated_at: Timestamp fijo para el footer. Si se pasa, el PDF es
+                reproducible byte a byte (modo invariant de ReportLab), lo que
+                permite cachear PDFs por (stats, params, generated_at).
             
         Returns:
-            PDF como bytes (listo para guardar o descargar).
+            PDF como bytes (listo para guardar o descargar), o None si se
+            escribió en sink.
         """
-        buffer = io.BytesIO()
+        if sink is None:
+            buffer = io.BytesIO()
+        elif isinstance(sink, (str, Path)):
+            buffer = str(sink)
+        else:
+            buffer = sink
+        
         doc = SimpleDocTemplate(
             buffer,
             pagesize=A4,
@@ -133,6 +289,7 @@ class AlphaReportGenerator:
             leftMargin=2*cm,
             topMargin=2*cm,
             bottomMargin=2*cm,
+            invariant=1 if generated_at is not None else None,
         )
         
         story = []
@@ -141,7 +298,7 @@ class AlphaReportGenerator:
         story.extend(self._build_header(strategy_name, metadata))
         
         # Línea separadora
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0e0e0')))
+        story.append(HRFlowable(width="100%", thickness=1, color=_C_GREY_BORDER))
         story.append(Spacer(1, 20))
         
         # Métricas principales
@@ -161,12 +318,52 @@ class AlphaReportGenerator:
             story.extend(self._build_params_section(strategy_params))
         
         # Footer
-        story.extend(self._build_footer())
+        story.extend(self._build_footer(generated_at))
         
         doc.build(story)
-        buffer.seek(0)
+        
+        if sink is not None:
+            return None
         return buffer.getvalue()
     
+    def generate_many(
+        self,
+        jobs: List[ReportJob],
+        max_workers: Optional[int] = None,
+        generated_at: Optional[datetime] = None,
+    ) -> List[bytes]:
+        """
+        Genera varios PDFs en paralelo (un proceso por CPU).
+        
+        Útil para barridos de parámetros o WFO que producen N reportes
+        independientes; ReportLab retiene el GIL, así que se usan procesos.
+        
+        Args:
+            jobs: Lista de (result, metadata, strategy_name, strategy_params).
+            max_workers: Número de procesos (default: CPUs disponibles).
+            generated_at: Timestamp común para todo el lote (default: ahora).
+            
+        Returns:
+            Lista de PDFs como bytes, en el mismo orden que jobs.
+        """
+        if not jobs:
+            return []
+        
+        generated_at = generated_at or datetime.now()
+        
+        # El objeto Portfolio de vectorbt no se usa en el PDF: no serializarlo
+        payload = [
+            (replace(result, portfolio=None), metadata, name, params)
+            for result, metadata, name, params in jobs
+        ]
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.title, self.subtitle),
+        ) as executor:
+            return list(executor.map(_generate_job, payload, repeat(generated_at)))
+    
     def _build_header(self, strategy_name: str, metadata: Optional[DataMetadata]) -> list:
         """Construye el header del reporte."""
         elements = []
@@ -186,7 +383,7 @@ class AlphaReportGenerator:
         
         return elements
     
-    def _build_key_metrics(self, result: BacktestResult) -> list:
+    def _build_key_metrics(self, result: "BacktestResult") -> list:
         """Construye sección de métricas clave."""
         elements = []
         
@@ -195,55 +392,24 @@ class AlphaReportGenerator:
         stats = result.stats
         
         # Crear tabla de métricas 2x4
-        metrics = [
-            ("Total Return", f"{stats.get('total_return_pct', 0):.2f}%"),
-            ("Sharpe Ratio", f"{stats.get('sharpe_ratio', 0):.2f}"),
-            ("Max Drawdown", f"{stats.get('max_drawdown_pct', 0):.2f}%"),
-            ("Win Rate", f"{stats.get('win_rate_pct', 0):.1f}%"),
-            ("Profit Factor", f"{stats.get('profit_factor', 0):.2f}"),
-            ("Avg Trade", f"{stats.get('avg_trade_pct', 0):.2f}%"),
-            ("Total Trades", f"{int(stats.get('num_trades', 0))}"),
-            ("Sortino Ratio", f"{stats.get('sortino_ratio', 0):.2f}"),
+        metrics = _format_stats(stats, _KEY_METRICS_SPEC)
+        
+        # 2 filas x 4 columnas (fila de valores seguida de su fila de labels)
+        labels, values = zip(*metrics)
+        value_rows = zip_longest(*[iter(values)] * 4, fillvalue="")
+        label_rows = zip_longest(*[iter(labels)] * 4, fillvalue="")
+        table_data = [
+            list(row) for pair in zip(value_rows, label_rows) for row in pair
         ]
         
-        # 2 filas x 4 columnas
-        table_data = []
-        for i in range(0, len(metrics), 4):
-            row_labels = []
-            row_values = []
-            for j in range(4):
-                if i + j < len(metrics):
-                    label, value = metrics[i + j]
-                    row_labels.append(label)
-                    row_values.append(value)
-                else:
-                    row_labels.append("")
-                    row_values.append("")
-            table_data.append(row_values)
-            table_data.append(row_labels)
-        
         table = Table(table_data, colWidths=[3.5*cm]*4)
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 16),
-            ('FONTSIZE', (0, 2), (-1, 2), 16),
-            ('FONTSIZE', (0, 1), (-1, 1), 9),
-            ('FONTSIZE', (0, 3), (-1, 3), 9),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#0f4c75')),
-            ('TEXTCOLOR', (0, 2), (-1, 2), colors.HexColor('#0f4c75')),
-            ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#888888')),
-            ('TEXTCOLOR', (0, 3), (-1, 3), colors.HexColor('#888888')),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        table.setStyle(_KEY_METRICS_TABLE_STYLE)
         
         elements.append(table)
         
         return elements
     
-    def _build_stats_table(self, result: BacktestResult) -> list:
+    def _build_stats_table(self, result: "BacktestResult") -> list:
         """Construye tabla de estadísticas detalladas."""
         elements = []
         
@@ -252,56 +418,24 @@ class AlphaReportGenerator:
         stats = result.stats
         
         # 2 columnas de stats
-        left_stats = [
-            ("Initial Capital", f"${stats.get('initial_capital', 10000):,.2f}"),
-            ("Final Equity", f"${stats.get('final_equity', 10000):,.2f}"),
-            ("Total Return", f"{stats.get('total_return_pct', 0):.2f}%"),
-            ("Annual Return", f"{stats.get('annual_return_pct', 0):.2f}%"),
-            ("Max Drawdown", f"{stats.get('max_drawdown_pct', 0):.2f}%"),
-        ]
-        
-        right_stats = [
-            ("Sharpe Ratio", f"{stats.get('sharpe_ratio', 0):.3f}"),
-            ("Sortino Ratio", f"{stats.get('sortino_ratio', 0):.3f}"),
-            ("Calmar Ratio", f"{stats.get('calmar_ratio', 0):.3f}"),
-            ("Win Rate", f"{stats.get('win_rate_pct', 0):.1f}%"),
-            ("Profit Factor", f"{stats.get('profit_factor', 0):.2f}"),
-        ]
+        left_stats = _format_stats(stats, _LEFT_STATS_SPEC)
+        right_stats = _format_stats(stats, _RIGHT_STATS_SPEC)
         
         # Combinar en tabla
         table_data = [["Metric", "Value", "Metric", "Value"]]
-        for i in range(max(len(left_stats), len(right_stats))):
-            row = []
-            if i < len(left_stats):
-                row.extend(left_stats[i])
-            else:
-                row.extend(["", ""])
-            if i < len(right_stats):
-                row.extend(right_stats[i])
-            else:
-                row.extend(["", ""])
-            table_data.append(row)
+        table_data.extend(
+            [*left, *right]
+            for left, right in zip_longest(left_stats, right_stats, fillvalue=("", ""))
+        )
         
         table = Table(table_data, colWidths=[4*cm, 3*cm, 4*cm, 3*cm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16213e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e0e0e0')),
-        ]))
+        table.setStyle(_STATS_TABLE_STYLE)
         
         elements.append(table)
         
         return elements
     
-    def _build_trades_summary(self, result: BacktestResult) -> list:
+    def _build_trades_summary(self, result: "BacktestResult") -> list:
         """Construye resumen de trades."""
         elements = []
         
@@ -316,10 +450,14 @@ class AlphaReportGenerator:
         # Stats básicos de trades
         total_trades = len(trades)
         if 'pnl' in trades.columns:
-            winning = len(trades[trades['pnl'] > 0])
-            losing = len(trades[trades['pnl'] < 0])
-            avg_win = trades[trades['pnl'] > 0]['pnl'].mean() if winning > 0 else 0
-            avg_loss = trades[trades['pnl'] < 0]['pnl'].mean() if losing > 0 else 0
+            # Una comparación por signo sobre el array, sin DataFrames filtrados
+            pnl = trades['pnl'].to_numpy(dtype=float)
+            wins_mask = pnl > 0
+            losses_mask = pnl < 0
+            winning = int(np.count_nonzero(wins_mask))
+            losing = int(np.count_nonzero(losses_mask))
+            avg_win = pnl[wins_mask].mean() if winning > 0 else 0
+            avg_loss = pnl[losses_mask].mean() if losing > 0 else 0
         else:
             winning = losing = 0
             avg_win = avg_loss = 0
@@ -333,14 +471,7 @@ class AlphaReportGenerator:
         ]
         
         table = Table(summary_data, colWidths=[6*cm, 4*cm])
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('LINEBELOW', (0, 0), (-1, -2), 0.5, colors.HexColor('#e0e0e0')),
-        ]))
+        table.setStyle(_TRADES_TABLE_STYLE)
         
         elements.append(table)
         
@@ -354,32 +485,22 @@ class AlphaReportGenerator:
         
         table_data = [[k, str(v)] for k, v in params.items()]
         table = Table(table_data, colWidths=[5*cm, 5*cm])
-        table.setStyle(TableStyle([
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        table.setStyle(_PARAMS_TABLE_STYLE)
         
         elements.append(table)
         
         return elements
     
-    def _build_footer(self) -> list:
+    def _build_footer(self, generated_at: Optional[datetime] = None) -> list:
         """Construye footer."""
         elements = []
         
-        elements.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0e0e0')))
+        elements.append(HRFlowable(width="100%", thickness=1, color=_C_GREY_BORDER))
         elements.append(Spacer(1, 10))
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = (generated_at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
         footer_text = f"<i>Generated on {timestamp} | Trading Backtester Pro</i>"
         
-        elements.append(Paragraph(footer_text, ParagraphStyle(
-            name='Footer',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.HexColor('#888888'),
-            alignment=TA_CENTER,
-        )))
+        elements.append(Paragraph(footer_text, self.styles['Footer']))
         
         return elements
@@ -1,11 +1,117 @@
 """Generador de reportes (independiente de UI)."""
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
 
-from ..backtest.engine import BacktestResult
+if TYPE_CHECKING:
+    # Solo para type hints: importar engine arrastra vectorbt (~2s de import)
+    from ..backtest.engine import BacktestResult
+
+
+_RULE = "=" * 40
+
+# Trazas con más puntos que esto se dibujan con WebGL (go.Scattergl). Menor
+# que el max_points por defecto de create_equity_chart: si no, el downsampling
+# previo impediría llegar a WebGL
+WEBGL_MIN_POINTS = 1000
+
+# Claves de result.stats que alimentan el resumen (en orden de salida) y sus labels
+_SUMMARY_STATS_KEYS = (
+    "total_return_pct",
+    "sharpe_ratio",
+    "max_drawdown_pct",
+    "win_rate_pct",
+    "profit_factor",
+    "num_trades",
+    "avg_trade_pct",
+)
+_SUMMARY_LABELS = (
+    "Total Return (%)",
+    "Sharpe Ratio",
+    "Max Drawdown (%)",
+    "Win Rate (%)",
+    "Profit Factor",
+    "Total Trades",
+    "Avg Trade (%)",
+)
+_NUM_TRADES_POS = _SUMMARY_STATS_KEYS.index("num_trades")
+
+
+def _summary_key(stats: dict) -> tuple:
+    """
+    Clave hasheable con los valores de stats que usa el resumen.
+    
+    Se normaliza a float para que 1, 1.0 y np.float64(1) compartan entrada
+    en el caché y el resultado no dependa de qué tipo llegó primero.
+    """
+    return tuple(float(stats.get(k, 0)) for k in _SUMMARY_STATS_KEYS)
+
+
+@lru_cache(maxsize=256)
+def _summary_items(values: tuple) -> tuple:
+    """Resumen (label, valor redondeado) memoizado por valores de stats."""
+    # Un solo np.round vectorial; num_trades se trunca a int aparte
+    rounded = np.round(np.array(values, dtype=np.float64), 2).tolist()
+    rounded[_NUM_TRADES_POS] = int(values[_NUM_TRADES_POS])
+    return tuple(zip(_SUMMARY_LABELS, rounded))
+
+
+@lru_cache(maxsize=256)
+def _summary_text(values: tuple) -> str:
+    """Resumen formateado como texto, memoizado por valores de stats."""
+    body = [f"{key}: {value}" for key, value in _summary_items(values)]
+    return "\n".join((_RULE, "BACKTEST SUMMARY", _RULE, *body, _RULE))
+
+
+def _lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices a conservar según Largest-Triangle-Three-Buckets (LTTB).
+    
+    Reduce una serie a n_out puntos preservando su forma visual (picos y
+    valles), a diferencia de un stride fijo que puede saltarse drawdowns.
+    Usa la posición como eje x.
+    
+    Args:
+        values: Valores de la serie (1D).
+        n_out: Número de puntos de salida (incluye primero y último).
+        
+    Returns:
+        Array ordenado de índices enteros.
+    """
+    n = values.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets interiores; el primer y último punto se conservan siempre
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < edges.size else n
+
+        # Punto promedio del bucket siguiente (tercer vértice del triángulo)
+        avg_x = (next_start + next_end - 1) / 2.0
+        avg_y = values[next_start:next_end].mean()
+
+        xs = np.arange(start, end)
+        areas = np.abs(
+            (prev - avg_x) * (values[start:end] - values[prev])
+            - (prev - xs) * (avg_y - values[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+
+    return selected
 
 
 @dataclass
@@ -20,23 +126,29 @@ class Report:
 class ReportGenerator:
     """Genera reportes a partir de resultados de backtest."""
 
-    def generate(self, result: BacktestResult) -> Report:
+    def generate(self, result: "BacktestResult", copy: bool = False) -> Report:
         """
         Genera reporte completo.
         
+        Por defecto trade_log y equity_data son copias superficiales: comparten
+        los datos con result (sin duplicar memoria), pero agregar/renombrar
+        columnas en el reporte no afecta al resultado. Tratar los valores como
+        solo lectura, o pasar copy=True para una copia profunda.
+        
         Args:
             result: Resultado de backtest.
+            copy: Si copiar profundamente trades y equity.
             
         Returns:
             Report con summary, trade_log y equity_data.
         """
         return Report(
             summary=self.generate_summary(result),
-            trade_log=result.trades.copy() if not result.trades.empty else pd.DataFrame(),
-            equity_data=result.equity.copy() if not result.equity.empty else pd.Series(),
+            trade_log=result.trades.copy(deep=copy) if not result.trades.empty else pd.DataFrame(),
+            equity_data=result.equity.copy(deep=copy) if not result.equity.empty else pd.Series(),
         )
 
-    def generate_summary(self, result: BacktestResult) -> dict:
+    def generate_summary(self, result: "BacktestResult") -> dict:
         """
         Genera resumen de métricas.
         
@@ -46,31 +158,60 @@ class ReportGenerator:
         Returns:
             Dict con métricas clave.
         """
-        stats = result.stats
-
-        return {
-            "Total Return (%)": round(stats.get("total_return_pct", 0), 2),
-            "Sharpe Ratio": round(stats.get("sharpe_ratio", 0), 2),
-            "Max Drawdown (%)": round(stats.get("max_drawdown_pct", 0), 2),
-            "Win Rate (%)": round(stats.get("win_rate_pct", 0), 2),
-            "Profit Factor": round(stats.get("profit_factor", 0), 2),
-            "Total Trades": int(stats.get("num_trades", 0)),
-            "Avg Trade (%)": round(stats.get("avg_trade_pct", 0), 2),
-        }
-
-    def export_to_csv(self, result: BacktestResult, path: Path | str) -> None:
+        # Nuevo dict en cada llamada: el caller puede modificarlo sin tocar el caché
+        return dict(_summary_items(_summary_key(result.stats)))
+
+    def export_to_csv(
+        self,
+        result: "BacktestResult",
+        path: Path | str,
+        float_format: str | None = None,
+        backend: str = "pandas",
+    ) -> None:
         """
         Exporta trades a CSV.
         
         Args:
             result: Resultado de backtest.
             path: Path del archivo CSV.
+            float_format: Formato opcional para floats (e.g., '%.6g'); reduce
+                el costo de formateo y el tamaño a cambio de precisión.
+            backend: 'pandas' o 'pyarrow'. pyarrow formatea en C++ sin el GIL
+                (mucho más rápido en trade logs grandes); no soporta
+                float_format, así que en ese caso se usa pandas.
+        
+        Raises:
+            ValueError: Si el backend no es válido.
         """
+        if backend not in ("pandas", "pyarrow"):
+            raise ValueError(f"Invalid backend '{backend}'. Valid options: ['pandas', 'pyarrow']")
+
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
-        result.trades.to_csv(path, index=False)
 
-    def format_summary_text(self, result: BacktestResult) -> str:
+        if backend == "pyarrow" and float_format is None:
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+
+            table = pa.Table.from_pandas(result.trades, preserve_index=False)
+            pacsv.write_csv(table, path)
+            return
+
+        result.trades.to_csv(path, index=False, float_format=float_format)
+
+    def export_to_parquet(self, result: "BacktestResult", path: Path | str) -> None:
+        """
+        Exporta trades a Parquet (columnar, sin costo de formateo de texto).
+        
+        Args:
+            result: Resultado de backtest.
+            path: Path del archivo Parquet.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        result.trades.to_parquet(path, engine="pyarrow", index=False)
+
+    def format_summary_text(self, result: "BacktestResult") -> str:
         """
         Formatea resumen como texto.
         
@@ -80,22 +221,22 @@ class ReportGenerator:
         Returns:
             String formateado para impresión.
         """
-        summary = self.generate_summary(result)
-
-        lines = ["=" * 40, "BACKTEST SUMMARY", "=" * 40]
-        for key, value in summary.items():
-            lines.append(f"{key}: {value}")
-        lines.append("=" * 40)
+        return _summary_text(_summary_key(result.stats))
 
-        return "\n".join(lines)
-
-    def create_equity_chart(self, result: BacktestResult, benchmark: pd.Series = None) -> "go.Figure":
+    def create_equity_chart(
+        self,
+        result: "BacktestResult",
+        benchmark: pd.Series = None,
+        max_points: int | None = 2000,
+    ) -> "go.Figure":
         """
         Crea gráfico de equity profesional.
         
         Args:
             result: Resultado del backtest.
             benchmark: Serie de benchmark (opcional).
+            max_points: Máximo de puntos por traza; series más largas se reducen
+                con LTTB (el gráfico no resuelve más que ~1000 px). None = sin límite.
             
         Returns:
             Plotly Figure object.
@@ -107,9 +248,20 @@ class ReportGenerator:
         fig = go.Figure()
         
         # Equity Curve
-        fig.add_trace(go.Scatter(
-            x=equity.index,
-            y=equity,
+        equity_values = equity.to_numpy()
+        equity_x = equity.index
+        if max_points is not None and equity_values.size > max_points:
+            keep = _lttb_indices(equity_values.astype(np.float64), max_points)
+            equity_x = equity_x[keep]
+            equity_values = equity_values[keep]
+        
+        # WebGL solo cuando la traza es grande: para pocas miles de puntos SVG
+        # renderiza bien y evita agotar los contextos WebGL del navegador
+        scatter_cls = go.Scattergl if equity_values.size > WEBGL_MIN_POINTS else go.Scatter
+        
+        fig.add_trace(scatter_cls(
+            x=equity_x,
+            y=equity_values,
             mode='lines',
             name='Portfolio Equity',
             line=dict(color='#00E676', width=2),
@@ -119,13 +271,19 @@ class ReportGenerator:
         
         # Benchmark (si existe)
         if benchmark is not None and not benchmark.empty:
-            # Rebase benchmark to match initial equity
-            initial_equity = equity.iloc[0]
-            initial_bench = benchmark.iloc[0]
-            bench_rebased = benchmark * (initial_equity / initial_bench)
+            # Rebase benchmark to match initial equity (un solo multiply sobre el array)
+            bench_values = benchmark.to_numpy()
+            bench_rebased = bench_values * (equity_values[0] / bench_values[0])
+            bench_x = benchmark.index
+            if max_points is not None and bench_rebased.size > max_points:
+                keep = _lttb_indices(bench_rebased.astype(np.float64), max_points)
+                bench_x = bench_x[keep]
+                bench_rebased = bench_rebased[keep]
+            
+            bench_cls = go.Scattergl if bench_rebased.size > WEBGL_MIN_POINTS else go.Scatter
             
-            fig.add_trace(go.Scatter(
-                x=bench_rebased.index,
+            fig.add_trace(bench_cls(
+                x=bench_x,
                 y=bench_rebased,
                 mode='lines',
                 name='Benchmark (SPY)',
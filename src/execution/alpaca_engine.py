@@ -20,20 +20,48 @@ Ejemplo de uso:
 """
 
 import os
-import sqlite3
-from datetime import datetime
-from dataclasses import dataclass, asdict
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from operator import attrgetter
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
 from dotenv import load_dotenv
 import alpaca_trade_api as tradeapi
+from requests.adapters import HTTPAdapter
+
+from .db import OrderLogDB, now_iso
 
 
 # Cargar variables de entorno
 load_dotenv()
 
 
+def _mount_pooled_adapter(session: Any) -> None:
+    """
+    Monta un HTTPAdapter con pool de conexiones keep-alive en la sesión REST.
+    
+    Las llamadas consecutivas (quote -> submit_order -> positions) reutilizan
+    la conexión TLS en vez de repetir el handshake; el pool admite las
+    órdenes concurrentes de close_all_positions_async. Sin reintentos propios
+    (max_retries=0): REST ya reintenta 429/504 (APCA_RETRY_MAX) y espera
+    HTTPError, no el RetryError que levantaría urllib3 al agotar los suyos.
+    """
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+
+
+def _quote_to_dict(quote: Any) -> Dict[str, float]:
+    """Convierte un quote de Alpaca a dict bid/ask/mid."""
+    bid = float(quote.bid_price)
+    ask = float(quote.ask_price)
+    return {"bid": bid, "ask": ask, "mid": (bid + ask) / 2}
+
+
 @dataclass
 class OrderLog:
     """Log de una orden ejecutada."""
@@ -50,6 +78,17 @@ class OrderLog:
     error: Optional[str] = None
 
 
+# Las columnas siguen el orden de los campos de OrderLog
+_INSERT_ORDER_SQL = (
+    "INSERT INTO order_logs (timestamp, symbol, side, qty, order_type, status, "
+    "filled_price, expected_price, slippage, order_id, error) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Fila para el INSERT en C (astuple hace deepcopy recursivo, ~20x más lento)
+_order_row = attrgetter(*(f.name for f in fields(OrderLog)))
+
+
 class AlpacaExecutor:
     """
     Ejecutor de órdenes usando Alpaca Paper Trading API.
@@ -65,6 +104,23 @@ class AlpacaExecutor:
     PAPER_URL = "https://paper-api.alpaca.markets"
     LIVE_URL = "https://api.alpaca.markets"
     
+    # Caché de cotizaciones: evita un RTT por orden al operar el mismo símbolo
+    QUOTE_CACHE_TTL_SECONDS = 0.25
+    QUOTE_CACHE_MAX_ENTRIES = 1024
+    
+    # Las posiciones cambian lento: repetir get_positions en el loop es gratis
+    POSITIONS_CACHE_TTL_SECONDS = 1.0
+    
+    # Columnas que muestra el historial (la UI no usa id/created_at/expected_price)
+    HISTORY_COLUMNS = (
+        "timestamp", "symbol", "side", "qty", "order_type",
+        "status", "filled_price", "slippage", "order_id", "error",
+    )
+    # Texto fijo: sqlite3 reutiliza el statement compilado de su caché
+    HISTORY_SQL = (
+        f"SELECT {', '.join(HISTORY_COLUMNS)} FROM order_logs ORDER BY id DESC LIMIT ?"
+    )
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -97,18 +153,28 @@ class AlpacaExecutor:
             base_url=base_url,
             api_version='v2'
         )
+        # REST no expone su requests.Session; _session es el único punto para
+        # montar el adapter con pool (y cerrarlo en close())
+        _mount_pooled_adapter(self.api._session)
         
         # Setup database para logging
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = OrderLogDB(self.db_path, _INSERT_ORDER_SQL)
         self._init_db()
+        
+        # Cliente asíncrono (aiohttp) creado solo si se usa
+        self._async_api = None
+        
+        self._quote_cache: OrderedDict[str, tuple[float, Dict[str, float]]] = OrderedDict()
+        self._quote_lock = threading.Lock()
+        
+        # (timestamp monotónico, posiciones); se invalida al enviar órdenes
+        self._positions_cache: Optional[tuple[float, List[Dict[str, Any]]]] = None
     
     def _init_db(self):
         """Inicializa la base de datos SQLite para logging."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        self._db.execute("""
             CREATE TABLE IF NOT EXISTS order_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT,
@@ -125,36 +191,10 @@ class AlpacaExecutor:
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         """)
-        
-        conn.commit()
-        conn.close()
     
     def _log_order(self, order_log: OrderLog):
-        """Guarda log de orden en SQLite."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO order_logs 
-            (timestamp, symbol, side, qty, order_type, status, 
-             filled_price, expected_price, slippage, order_id, error)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            order_log.timestamp,
-            order_log.symbol,
-            order_log.side,
-            order_log.qty,
-            order_log.order_type,
-            order_log.status,
-            order_log.filled_price,
-            order_log.expected_price,
-            order_log.slippage,
-            order_log.order_id,
-            order_log.error,
-        ))
-        
-        conn.commit()
-        conn.close()
+        """Encola el log de la orden para escritura por lotes en SQLite."""
+        self._db.append(_order_row(order_log))
     
     def get_account(self) -> Dict[str, Any]:
         """
@@ -179,11 +219,18 @@ class AlpacaExecutor:
         """
         Obtiene posiciones abiertas.
         
+        Las posiciones se cachean POSITIONS_CACHE_TTL_SECONDS y el caché se
+        invalida en cada place_order. Los dicts se comparten entre llamadas
+        dentro del TTL: tratarlos como solo lectura.
+        
         Returns:
             Lista de posiciones con symbol, qty, market_value, etc.
         """
-        positions = self.api.list_positions()
-        return [
+        cached = self._positions_cache
+        if cached is not None and time.monotonic() - cached[0] < self.POSITIONS_CACHE_TTL_SECONDS:
+            return list(cached[1])
+        
+        positions = [
             {
                 "symbol": p.symbol,
                 "qty": float(p.qty),
@@ -194,8 +241,10 @@ class AlpacaExecutor:
                 "unrealized_pl": float(p.unrealized_pl),
                 "unrealized_plpc": float(p.unrealized_plpc) * 100,
             }
-            for p in positions
+            for p in self.api.list_positions()
         ]
+        self._positions_cache = (time.monotonic(), positions)
+        return list(positions)
     
     def get_quote(self, symbol: str) -> Dict[str, float]:
         """
@@ -207,15 +256,77 @@ class AlpacaExecutor:
         Returns:
             Dict con bid, ask, last price.
         """
+        cached = self._get_cached_quote(symbol)
+        if cached is not None:
+            return cached
+        
         try:
-            quote = self.api.get_latest_quote(symbol)
-            return {
-                "bid": float(quote.bid_price),
-                "ask": float(quote.ask_price),
-                "mid": (float(quote.bid_price) + float(quote.ask_price)) / 2,
-            }
+            quote = _quote_to_dict(self.api.get_latest_quote(symbol))
         except Exception as e:
             return {"error": str(e)}
+        
+        self._put_cached_quote(symbol, quote)
+        return dict(quote)
+    
+    def _get_cached_quote(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Retorna la cotización en caché si existe y no expiró."""
+        with self._quote_lock:
+            entry = self._quote_cache.get(symbol)
+            if entry is None:
+                return None
+            
+            stored_at, quote = entry
+            if time.monotonic() - stored_at >= self.QUOTE_CACHE_TTL_SECONDS:
+                del self._quote_cache[symbol]
+                return None
+            
+            self._quote_cache.move_to_end(symbol)
+        return dict(quote)
+    
+    def _put_cached_quote(self, symbol: str, quote: Dict[str, float]) -> None:
+        """Guarda una cotización, descartando la más antigua si se llena."""
+        with self._quote_lock:
+            self._quote_cache[symbol] = (time.monotonic(), quote)
+            self._quote_cache.move_to_end(symbol)
+            while len(self._quote_cache) > self.QUOTE_CACHE_MAX_ENTRIES:
+                self._quote_cache.popitem(last=False)
+    
+    def _invalidate_quote(self, symbol: str) -> None:
+        """Descarta la cotización en caché de un símbolo."""
+        with self._quote_lock:
+            self._quote_cache.pop(symbol, None)
+    
+    def _get_async_api(self):
+        """Crea (lazy) el cliente AsyncRest de Alpaca para market data."""
+        if self._async_api is None:
+            from alpaca_trade_api.rest_async import AsyncRest
+            self._async_api = AsyncRest(key_id=self.api_key, secret_key=self.secret_key)
+        return self._async_api
+    
+    async def get_quotes_async(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Obtiene cotizaciones de varios símbolos en paralelo.
+        
+        Args:
+            symbols: Tickers a cotizar.
+            
+        Returns:
+            Dict symbol -> {bid, ask, mid}. Los símbolos que fallan se omiten.
+        """
+        api = self._get_async_api()
+        results = await asyncio.gather(
+            *(api.get_latest_quote_async(symbol) for symbol in symbols),
+            return_exceptions=True,
+        )
+        
+        quotes = {}
+        for result in results:
+            if result is None or isinstance(result, BaseException):
+                continue
+            symbol, quote = result
+            quotes[symbol] = _quote_to_dict(quote)
+            self._put_cached_quote(symbol, dict(quotes[symbol]))
+        return quotes
     
     def place_order(
         self,
@@ -240,7 +351,7 @@ class AlpacaExecutor:
         Returns:
             OrderLog con detalles de la ejecución.
         """
-        timestamp = datetime.now().isoformat()
+        timestamp = now_iso()
         
         try:
             # Obtener precio actual si no se especificó expected_price
@@ -270,6 +381,9 @@ class AlpacaExecutor:
                     limit_price=limit_price
                 )
             
+            # La orden cambia (o cambiará al llenarse) las posiciones
+            self._positions_cache = None
+            
             # Crear log
             order_log = OrderLog(
                 timestamp=timestamp,
@@ -295,6 +409,8 @@ class AlpacaExecutor:
             return order_log
             
         except Exception as e:
+            self._invalidate_quote(symbol)
+            self._positions_cache = None
             order_log = OrderLog(
                 timestamp=timestamp,
                 symbol=symbol,
@@ -311,22 +427,29 @@ class AlpacaExecutor:
             self._log_order(order_log)
             return order_log
     
-    def close_position(self, symbol: str) -> OrderLog:
+    def close_position(
+        self,
+        symbol: str,
+        position: Optional[Dict[str, Any]] = None,
+    ) -> OrderLog:
         """
         Cierra una posición completamente.
         
         Args:
             symbol: Ticker a cerrar.
+            position: Posición ya obtenida con get_positions(). Si se pasa,
+                se evita volver a pedir la lista completa a Alpaca.
             
         Returns:
             OrderLog de la orden de cierre.
         """
-        positions = self.get_positions()
-        position = next((p for p in positions if p["symbol"] == symbol), None)
+        if position is None:
+            positions = self.get_positions()
+            position = next((p for p in positions if p["symbol"] == symbol), None)
         
         if not position:
             return OrderLog(
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_iso(),
                 symbol=symbol,
                 side="sell",
                 qty=0,
@@ -353,11 +476,43 @@ class AlpacaExecutor:
         logs = []
         
         for pos in positions:
-            log = self.close_position(pos["symbol"])
+            log = self.close_position(pos["symbol"], position=pos)
             logs.append(log)
         
         return logs
     
+    async def close_all_positions_async(self) -> List[OrderLog]:
+        """
+        Cierra todas las posiciones abiertas en paralelo.
+        
+        Las cotizaciones se piden juntas con AsyncRest y las órdenes se envían
+        concurrentemente desde hilos (el REST de órdenes de Alpaca es
+        síncrono), así N posiciones cuestan ~1 RTT en vez de N.
+        
+        Returns:
+            Lista de OrderLogs, en el orden de las posiciones.
+        """
+        positions = await asyncio.to_thread(self.get_positions)
+        quotes = await self.get_quotes_async([p["symbol"] for p in positions])
+        
+        tasks = []
+        for pos in positions:
+            side = "sell" if pos["side"] == "long" else "buy"
+            quote = quotes.get(pos["symbol"])
+            expected_price = None
+            if quote is not None:
+                expected_price = quote["ask"] if side == "buy" else quote["bid"]
+            tasks.append(asyncio.to_thread(
+                self.place_order,
+                pos["symbol"],
+                qty=abs(pos["qty"]),
+                side=side,
+                expected_price=expected_price,
+            ))
+        
+        logs = await asyncio.gather(*tasks)
+        return list(logs)
+    
     def get_order_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Obtiene historial de órdenes desde SQLite.
@@ -366,23 +521,10 @@ class AlpacaExecutor:
             limit: Número máximo de órdenes.
             
         Returns:
-            Lista de órdenes ordenadas por fecha descendente.
+            Lista de órdenes, la más reciente primero (por id, que usa el
+            índice implícito del rowid en vez de ordenar toda la tabla).
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM order_logs 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        """, (limit,))
-        
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        
-        conn.close()
-        
-        return [dict(zip(columns, row)) for row in rows]
+        return self._db.query(self.HISTORY_SQL, (limit,))
     
     def is_market_open(self) -> bool:
         """Verifica si el mercado está abierto."""
@@ -397,3 +539,14 @@ class AlpacaExecutor:
             "next_open": str(clock.next_open),
             "next_close": str(clock.next_close),
         }
+    
+    def close(self) -> None:
+        """Persiste/cierra el log SQLite y cierra la sesión HTTP."""
+        self._db.close()
+        self.api._session.close()
+    
+    def __enter__(self) -> "AlpacaExecutor":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
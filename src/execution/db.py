@@ -0,0 +1,312 @@
+"""Helpers SQLite compartidos por los ejecutores (logging de órdenes)."""
+
+import queue
+import sqlite3
+import threading
+import time
+import warnings
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+
+_time_ns = time.time_ns
+
+# (segundo epoch, "YYYY-MM-DDTHH:MM:SS" local); tupla para reasignarla atómicamente
+_iso_prefix: tuple[int, str] = (-1, "")
+
+
+def now_iso() -> str:
+    """
+    Timestamp ISO-8601 local (con microsegundos) para los logs de órdenes.
+    
+    Solo se construye un datetime cuando cambia el segundo; dentro del mismo
+    segundo se reutiliza el prefijo y se formatean únicamente los µs.
+    """
+    global _iso_prefix
+    seconds, nanos = divmod(_time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _iso_prefix
+    if seconds != cached_seconds:
+        prefix = datetime.fromtimestamp(seconds).isoformat()
+        _iso_prefix = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}"
+
+
+def connect_db(db_path: Path) -> sqlite3.Connection:
+    """
+    Abre una conexión SQLite persistente configurada para escrituras rápidas.
+    
+    WAL + synchronous=NORMAL evita un fsync por INSERT; la conexión se
+    comparte entre hilos (protegida por un lock en OrderLogDB).
+    
+    Args:
+        db_path: Path del archivo SQLite.
+        
+    Returns:
+        Conexión en modo autocommit con los PRAGMAs aplicados.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    # Tras cada checkpoint el WAL se trunca a <= 64 MB
+    conn.execute("PRAGMA journal_size_limit=67108864")
+    # Mapeo columna -> valor en C, sin reconstruir dicts con zip en Python
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _open_memory_copy(db_path: Path) -> sqlite3.Connection:
+    """
+    Abre una base SQLite en memoria con el contenido actual de `db_path`.
+    
+    Cargar el archivo primero hace que los volcados posteriores (backup
+    completo hacia disco) conserven el historial previo.
+    
+    Args:
+        db_path: Path del archivo SQLite (puede no existir aún).
+        
+    Returns:
+        Conexión en memoria, en modo autocommit.
+    """
+    conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+    disk = connect_db(db_path)
+    try:
+        disk.backup(conn)
+    finally:
+        disk.close()
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class _OrderLogWriter:
+    """
+    Conexión, cola, hilo escritor y timer de checkpoint de un OrderLogDB.
+    
+    Los hilos referencian solo este objeto y nunca al OrderLogDB, así una
+    instancia descartada puede recolectarse y su finalizer (weakref.finalize)
+    detiene los hilos y cierra la conexión.
+    """
+    
+    # Marca de fin para el hilo escritor
+    _STOP = object()
+    
+    def __init__(
+        self,
+        db_path: Path,
+        insert_sql: str,
+        memory: bool,
+        flush_max_rows: int,
+        queue_max_rows: int,
+        checkpoint_interval: float,
+    ):
+        self.db_path = db_path
+        self.insert_sql = insert_sql
+        self.memory = memory
+        self.flush_max_rows = flush_max_rows
+        self.checkpoint_interval = checkpoint_interval
+        self.conn = _open_memory_copy(db_path) if memory else connect_db(db_path)
+        self.lock = threading.Lock()
+        self.closed = False
+        
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_max_rows)
+        self.thread = threading.Thread(target=self._run, name="order-log-writer", daemon=True)
+        self.thread.start()
+        
+        self.timer: threading.Timer | None = None
+        self._schedule_checkpoint()
+    
+    def shutdown(self) -> None:
+        """Drena la cola, detiene el escritor y cierra la conexión (idempotente)."""
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.thread.is_alive():
+            self.queue.put(self._STOP)
+            self.thread.join()
+        with self.lock:
+            if self.closed:
+                return
+            if self.memory:
+                self._sync_to_disk()
+            self.conn.close()
+            self.closed = True
+    
+    def _run(self) -> None:
+        """Consume la cola y escribe lotes hasta recibir _STOP."""
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.flush_max_rows:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = any(row is self._STOP for row in batch)
+            rows = [row for row in batch if row is not self._STOP]
+            try:
+                if rows:
+                    self._write_rows(rows)
+            except Exception as e:
+                # Los logs son retrospectivos: avisar pero no tumbar el escritor
+                warnings.warn(f"No se pudieron guardar {len(rows)} logs de órdenes: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+    
+    def _write_rows(self, rows: List[tuple]) -> None:
+        """Escribe un lote; si falla, reintenta fila a fila y descarta solo las inválidas."""
+        try:
+            self._write_batch(rows)
+        except Exception:
+            if len(rows) == 1:
+                raise
+            for row in rows:
+                try:
+                    self._write_batch([row])
+                except Exception as e:
+                    warnings.warn(f"No se pudo guardar un log de órdenes: {e}")
+    
+    def _write_batch(self, rows: List[tuple]) -> None:
+        """Inserta un lote en una sola transacción."""
+        with self.lock:
+            # La conexión es autocommit: BEGIN/COMMIT explícitos para un solo sync
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(self.insert_sql, rows)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                # Cualquier error (ej. OverflowError al convertir un valor)
+                # deja la transacción abierta: cerrarla antes de propagar
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                raise
+    
+    def _schedule_checkpoint(self) -> None:
+        """Programa el próximo checkpoint en un timer daemon."""
+        self.timer = threading.Timer(self.checkpoint_interval, self._checkpoint)
+        self.timer.daemon = True
+        self.timer.start()
+    
+    def _checkpoint(self) -> None:
+        """Checkpoint del WAL (o volcado a disco en modo memoria), luego reprograma."""
+        with self.lock:
+            if self.closed:
+                return
+            if self.memory:
+                self._sync_to_disk()
+            else:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._schedule_checkpoint()
+    
+    def _sync_to_disk(self) -> None:
+        """Copia la base en memoria al archivo (con el lock tomado)."""
+        disk = connect_db(self.db_path)
+        try:
+            self.conn.backup(disk)
+        except sqlite3.Error as e:
+            warnings.warn(f"No se pudo sincronizar el log de órdenes a disco: {e}")
+        finally:
+            disk.close()
+
+
+class OrderLogDB:
+    """
+    Conexión SQLite persistente con escritura de logs en un hilo aparte.
+    
+    append() solo encola la fila en una cola acotada; un hilo escritor
+    daemon la consume y escribe lotes de hasta FLUSH_MAX_ROWS filas con un
+    único executemany dentro de una transacción explícita. Así el hilo que
+    envía la orden nunca espera al disco. Las lecturas hacen flush antes
+    para ver siempre las últimas órdenes.
+    
+    Un timer en segundo plano hace `wal_checkpoint(TRUNCATE)` cada
+    CHECKPOINT_INTERVAL_SECONDS para que el WAL no crezca sin límite en
+    sesiones 24/7 (y el checkpoint automático no coincida con una orden).
+    
+    Con `memory=True` (backtests / paper con miles de órdenes simuladas) la
+    base vive en RAM: se carga desde disco al abrir y ese mismo timer la
+    vuelca completa al archivo con la API de backup, igual que close(). Las
+    escrituras no tocan el disco; se pierde como máximo un intervalo de logs.
+    
+    close() libera la conexión y ambos hilos. Si no se llama, lo hace un
+    weakref.finalize cuando la instancia se recolecta o al salir del proceso,
+    sin que el registro mantenga viva la instancia.
+    """
+    
+    FLUSH_MAX_ROWS = 50
+    QUEUE_MAX_ROWS = 10_000
+    CHECKPOINT_INTERVAL_SECONDS = 60.0
+    
+    def __init__(self, db_path: Path, insert_sql: str, memory: bool = False):
+        """
+        Args:
+            db_path: Path del archivo SQLite.
+            insert_sql: Sentencia INSERT parametrizada para append().
+            memory: Si mantener la base en RAM y sincronizarla a disco
+                periódicamente (en vez de escribir cada lote en el archivo).
+        """
+        self.insert_sql = insert_sql
+        self.db_path = db_path
+        self.memory = memory
+        self._writer = _OrderLogWriter(
+            db_path,
+            insert_sql,
+            memory,
+            self.FLUSH_MAX_ROWS,
+            self.QUEUE_MAX_ROWS,
+            self.CHECKPOINT_INTERVAL_SECONDS,
+        )
+        self._finalizer = weakref.finalize(self, self._writer.shutdown)
+    
+    def append(self, row: tuple) -> None:
+        """
+        Encola una fila para el hilo escritor (bloquea solo si la cola está llena).
+        
+        Raises:
+            RuntimeError: Si el hilo escritor no está corriendo (log cerrado).
+        """
+        self._check_writer()
+        self._writer.queue.put(row)
+    
+    def flush(self) -> None:
+        """
+        Espera a que el hilo escritor persista todas las filas encoladas.
+        
+        Raises:
+            RuntimeError: Si el hilo escritor no está corriendo (log cerrado).
+        """
+        self._check_writer()
+        self._writer.queue.join()
+    
+    def _check_writer(self) -> None:
+        """Falla de inmediato en vez de esperar a un escritor que ya no consume la cola."""
+        if not self._writer.thread.is_alive():
+            raise RuntimeError("Order log writer is not running (database closed?)")
+    
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        """Ejecuta una sentencia sin resultados (DDL, PRAGMAs)."""
+        with self._writer.lock:
+            self._writer.conn.execute(sql, params)
+    
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """
+        Ejecuta un SELECT (tras hacer flush de lo pendiente).
+        
+        Args:
+            sql: Sentencia SELECT parametrizada.
+            params: Parámetros de la sentencia.
+            
+        Returns:
+            Lista de filas como dicts columna -> valor.
+        """
+        self.flush()
+        with self._writer.lock:
+            return [dict(row) for row in self._writer.conn.execute(sql, params)]
+    
+    def close(self) -> None:
+        """Drena la cola, detiene el escritor y cierra la conexión (idempotente)."""
+        self._finalizer()
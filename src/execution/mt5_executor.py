@@ -9,18 +9,84 @@ Uso:
     print(result)
 """
 
+import os
 import json
 import time
-import sqlite3
-from datetime import datetime
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, fields
+from operator import attrgetter
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+from .db import OrderLogDB, now_iso
 
-@dataclass
+try:  # Opcional: ~3x más rápido que json y emite bytes directamente
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+try:  # Opcional (solo Linux): despierta al escribir la respuesta en vez de hacer polling
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # pragma: no cover - depende de la plataforma
+    INotify = None
+
+
+def _encode_command(command: Dict[str, Any]) -> bytes:
+    """
+    Serializa un comando a JSON compacto en bytes ASCII.
+    
+    FileCommander.mq5 parsea `"clave":valor` con StringFind, así que el
+    protocolo sigue siendo JSON; solo se omiten espacios y la capa de texto.
+    """
+    if orjson is not None:
+        return orjson.dumps(command)
+    return json.dumps(command, separators=(",", ":")).encode("ascii")
+
+
+def _decode_response(payload: bytes | memoryview) -> Dict[str, Any]:
+    """
+    Parsea la respuesta JSON de MT5.
+    
+    orjson lee directo de la vista del buffer; json solo acepta bytes.
+    
+    Raises:
+        json.JSONDecodeError: Si la respuesta no es JSON válido
+            (orjson.JSONDecodeError es subclase).
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(bytes(payload))
+
+
+def _create_watcher(directory: Path):
+    """
+    Crea un watcher inotify sobre el directorio de archivos de MT5.
+    
+    Args:
+        directory: Carpeta MQL5/Files donde MT5 escribe la respuesta.
+        
+    Returns:
+        INotify activo, o None si inotify no está disponible (Windows/macOS,
+        paquete no instalado o directorio inexistente).
+    """
+    if INotify is None:
+        return None
+    try:
+        watcher = INotify()
+        watcher.add_watch(directory, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+    except OSError:
+        return None
+    return watcher
+
+
+@dataclass(slots=True)
 class MT5OrderLog:
-    """Log de una orden ejecutada en MT5."""
+    """
+    Log de una orden ejecutada en MT5.
+    
+    Con slots (sin __dict__ por instancia); no es frozen porque el
+    __setattr__ de un dataclass frozen hace la construcción ~5x más lenta.
+    """
     timestamp: str
     symbol: str
     side: str
@@ -31,13 +97,38 @@ class MT5OrderLog:
     error: Optional[str] = None
 
 
+# Las columnas siguen el orden de los campos de MT5OrderLog
+_INSERT_MT5_SQL = (
+    "INSERT INTO mt5_order_logs (timestamp, symbol, side, volume, status, "
+    "order_id, price, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Fila para el INSERT en C (astuple hace deepcopy recursivo, ~20x más lento)
+_mt5_order_row = attrgetter(*(f.name for f in fields(MT5OrderLog)))
+
+
 class MT5FileExecutor:
     """
     Ejecutor de órdenes para MT5 via comunicación por archivos.
     
     Requiere que FileCommander.mq5 esté corriendo en MT5.
+    
+    Si `inotify_simple` está instalado (Linux/Wine) la espera de respuesta se
+    bloquea en el kernel hasta que MT5 cierra el archivo; si no, hace polling
+    cada POLL_INTERVAL_SECONDS.
     """
     
+    POLL_INTERVAL_SECONDS = 0.1
+    RESPONSE_BUFFER_BYTES = 65536
+    
+    HISTORY_COLUMNS = (
+        "timestamp", "symbol", "side", "volume", "status", "order_id", "price", "error",
+    )
+    # Texto fijo: sqlite3 reutiliza el statement compilado de su caché
+    HISTORY_SQL = (
+        f"SELECT {', '.join(HISTORY_COLUMNS)} FROM mt5_order_logs ORDER BY id DESC LIMIT ?"
+    )
+    
     def __init__(
         self,
         mt5_files_path: str = None,
@@ -45,6 +136,7 @@ class MT5FileExecutor:
         response_file: str = "mt5_response.txt",
         timeout: float = 5.0,
         db_path: str = "data/mt5_orders.db",
+        memory: bool = False,
     ):
         """
         Args:
@@ -53,6 +145,8 @@ class MT5FileExecutor:
             response_file: Nombre del archivo de respuestas.
             timeout: Segundos a esperar por respuesta.
             db_path: Path para SQLite de logging.
+            memory: Si loguear en una SQLite en RAM que se sincroniza a
+                db_path periódicamente y al cerrar (backtests / paper).
         """
         # Detectar path de MT5 automáticamente
         if mt5_files_path is None:
@@ -62,19 +156,21 @@ class MT5FileExecutor:
         self.mt5_files_path = Path(mt5_files_path)
         self.command_file = self.mt5_files_path / command_file
         self.response_file = self.mt5_files_path / response_file
+        self._command_tmp = self.command_file.with_suffix(".tmp")
         self.timeout = timeout
+        self._watcher = _create_watcher(self.mt5_files_path)
+        self._command_lock = threading.Lock()
+        self._rxbuf = bytearray(self.RESPONSE_BUFFER_BYTES)  # Reutilizado por _read_response
         
         # Setup database para logging
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = OrderLogDB(self.db_path, _INSERT_MT5_SQL, memory=memory)
         self._init_db()
     
     def _init_db(self):
         """Inicializa la base de datos SQLite para logging."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        self._db.execute("""
             CREATE TABLE IF NOT EXISTS mt5_order_logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT,
@@ -88,63 +184,119 @@ class MT5FileExecutor:
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         """)
-        
-        conn.commit()
-        conn.close()
     
     def _log_order(self, order_log: MT5OrderLog):
-        """Guarda log de orden en SQLite."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Encola el log de la orden para escritura por lotes en SQLite."""
+        self._db.append(_mt5_order_row(order_log))
+    
+    def _log_order_tuple(self, row: tuple) -> None:
+        """
+        Encola una fila ya armada, sin pasar por MT5OrderLog.
         
-        cursor.execute("""
-            INSERT INTO mt5_order_logs 
-            (timestamp, symbol, side, volume, status, order_id, price, error)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            order_log.timestamp,
-            order_log.symbol,
-            order_log.side,
-            order_log.volume,
-            order_log.status,
-            order_log.order_id,
-            order_log.price,
-            order_log.error,
-        ))
+        Para callers de alto volumen (p. ej. backtests que simulan órdenes).
         
-        conn.commit()
-        conn.close()
+        Args:
+            row: Tupla en el orden de los campos de MT5OrderLog
+                (timestamp, symbol, side, volume, status, order_id, price, error).
+        """
+        self._db.append(row)
     
     def _send_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """
         Envía comando a MT5 escribiendo archivo y esperando respuesta.
+        
+        El canal es un único par de archivos, así que los comandos se
+        serializan con un lock: dos hilos no pueden pisarse el archivo de
+        comando ni robarse la respuesta del otro.
+        """
+        with self._command_lock:
+            return self._exchange(command)
+    
+    def _exchange(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Escribe un comando y espera su respuesta (con el lock tomado).
+        
+        El comando se escribe en un temporal y se renombra con os.replace
+        (atómico), así MT5 nunca lee un JSON a medio escribir. Del lado de MT5
+        WriteResponse debería hacer lo mismo (FileMove con FILE_REWRITE); hasta
+        entonces una respuesta truncada se reintenta en vez de fallar.
         """
         try:
             # Limpiar respuesta anterior si existe
             if self.response_file.exists():
                 self.response_file.unlink()
             
-            # Escribir comando
-            json_cmd = json.dumps(command)
-            self.command_file.write_text(json_cmd)
+            # Escribir comando (temporal + rename atómico)
+            self._command_tmp.write_bytes(_encode_command(command))
+            os.replace(self._command_tmp, self.command_file)
             
             # Esperar respuesta
-            start_time = time.time()
-            while time.time() - start_time < self.timeout:
-                if self.response_file.exists():
-                    response_text = self.response_file.read_text()
-                    if response_text:
+            decode_error = None
+            deadline = time.monotonic() + self.timeout
+            while True:
+                payload = self._read_response()
+                if payload:
+                    try:
+                        response = _decode_response(payload)
+                    except json.JSONDecodeError as e:
+                        # MT5 puede estar escribiendo aún: esperar el cierre
+                        decode_error = e
+                    else:
                         self.response_file.unlink()  # Limpiar
-                        return json.loads(response_text)
-                time.sleep(0.1)
+                        return response
+                    finally:
+                        payload.release()
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wait_for_change(remaining)
             
+            if decode_error is not None:
+                return {"status": "error", "message": f"Invalid JSON response: {decode_error}"}
             return {"status": "error", "message": "Timeout esperando respuesta de MT5"}
             
-        except json.JSONDecodeError as e:
-            return {"status": "error", "message": f"Invalid JSON response: {e}"}
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    def _read_response(self) -> Optional[memoryview]:
+        """
+        Lee el archivo de respuesta en el buffer reutilizable `_rxbuf`.
+        
+        Abrir directamente (sin exists() previo) ahorra un stat por vuelta, y
+        readinto evita asignar un bytes nuevo en cada intento. El buffer crece
+        al doble si la respuesta (p. ej. muchas posiciones) no cabe.
+        
+        Returns:
+            Vista sobre los bytes leídos, o None si aún no hay respuesta.
+        """
+        try:
+            with open(self.response_file, "rb", buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if size > len(self._rxbuf):
+                    self._rxbuf = bytearray(max(size, 2 * len(self._rxbuf)))
+                view = memoryview(self._rxbuf)
+                read = 0
+                while read < size:
+                    chunk = f.readinto(view[read:size])
+                    if not chunk:
+                        break  # Archivo truncado mientras leíamos
+                    read += chunk
+        except FileNotFoundError:
+            return None
+        
+        payload = view[:read]
+        view.release()
+        return payload
+    
+    def _wait_for_change(self, remaining: float) -> None:
+        """Bloquea hasta un cambio en la carpeta de MT5 (o el intervalo de polling)."""
+        if self._watcher is not None:
+            # Cualquier escritura despierta; el caller re-verifica el archivo
+            self._watcher.read(timeout=max(1, int(remaining * 1000)))
+        else:
+            time.sleep(min(self.POLL_INTERVAL_SECONDS, remaining))
+    
     def ping(self) -> bool:
         """Verifica conexión con MT5."""
         result = self._send_command({"action": "ping"})
@@ -172,7 +324,7 @@ class MT5FileExecutor:
     
     def buy(self, symbol: str, volume: float = 0.01) -> MT5OrderLog:
         """Ejecuta orden de compra."""
-        timestamp = datetime.now().isoformat()
+        timestamp = now_iso()
         
         result = self._send_command({
             "action": "buy",
@@ -196,7 +348,7 @@ class MT5FileExecutor:
     
     def sell(self, symbol: str, volume: float = 0.01) -> MT5OrderLog:
         """Ejecuta orden de venta."""
-        timestamp = datetime.now().isoformat()
+        timestamp = now_iso()
         
         result = self._send_command({
             "action": "sell",
@@ -220,7 +372,7 @@ class MT5FileExecutor:
     
     def close_position(self, symbol: str) -> MT5OrderLog:
         """Cierra posición abierta."""
-        timestamp = datetime.now().isoformat()
+        timestamp = now_iso()
         
         result = self._send_command({
             "action": "close",
@@ -254,9 +406,35 @@ class MT5FileExecutor:
         else:
             return self.sell(symbol, volume=qty)
     
+    def get_order_history(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Obtiene historial de órdenes MT5 desde SQLite.
+        
+        Args:
+            limit: Número máximo de órdenes.
+            
+        Returns:
+            Lista de órdenes, la más reciente primero.
+        """
+        return self._db.query(self.HISTORY_SQL, (limit,))
+    
     def is_connected(self) -> bool:
         """Verifica si FileCommander está corriendo en MT5."""
         return self.ping()
+    
+    def close(self) -> None:
+        """Libera el watcher de inotify y persiste/cierra el log SQLite."""
+        with self._command_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+        self._db.close()
+    
+    def __enter__(self) -> "MT5FileExecutor":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
 
 # Alias para compatibilidad
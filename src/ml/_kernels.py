@@ -0,0 +1,92 @@
+"""Kernels Numba para indicadores rolling usados en feature engineering.
+
+Reimplementan sobre arrays float64 las mismas fórmulas que pandas para SMA y
+desviación estándar móvil, en una sola pasada O(1) por paso y sin el overhead
+de construir Series intermedias. RSI, ATR y MACD usan los kernels compatibles
+con pandas-ta de `src.strategy._kernels` (una sola política de NaN).
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def sma_nb(x: np.ndarray, n: int) -> np.ndarray:
+    """Media móvil simple (equivale a `rolling(n).mean()`, NaN-aware)."""
+    size = x.shape[0]
+    out = np.full(size, np.nan)
+    total = 0.0
+    count = 0
+    for i in range(size):
+        value = x[i]
+        if not np.isnan(value):
+            total += value
+            count += 1
+        if i >= n:
+            old = x[i - n]
+            if not np.isnan(old):
+                total -= old
+                count -= 1
+        if i >= n - 1 and count == n:
+            out[i] = total / n
+    return out
+
+
+@njit(cache=True)
+def rolling_std_nb(x: np.ndarray, n: int) -> np.ndarray:
+    """Desviación estándar móvil ddof=1 con Welford (equivale a `rolling(n).std()`)."""
+    size = x.shape[0]
+    out = np.full(size, np.nan)
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    for i in range(size):
+        value = x[i]
+        if not np.isnan(value):
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        if i >= n:
+            old = x[i - n]
+            if not np.isnan(old):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+        if i >= n - 1 and count == n and n > 1:
+            out[i] = np.sqrt(max(m2, 0.0) / (n - 1))
+    return out
+
+
+@njit(cache=True)
+def valid_rows_nb(matrix: np.ndarray) -> np.ndarray:
+    """
+    Máscara de filas sin NaN (equivale a `~df.isna().any(axis=1)`).
+    
+    No materializa la matriz booleana (N, F) intermedia. Recorre en el orden
+    de la memoria: por columnas si la matriz es Fortran (la que arma
+    create_features), o por filas cortando en el primer NaN si es C.
+    """
+    n_rows, n_cols = matrix.shape
+    if matrix.flags.f_contiguous:
+        out = np.ones(n_rows, dtype=np.bool_)
+        for j in range(n_cols):
+            for i in range(n_rows):
+                if np.isnan(matrix[i, j]):
+                    out[i] = False
+        return out
+
+    out = np.empty(n_rows, dtype=np.bool_)
+    for i in range(n_rows):
+        valid = True
+        for j in range(n_cols):
+            if np.isnan(matrix[i, j]):
+                valid = False
+                break
+        out[i] = valid
+    return out
@@ -4,7 +4,91 @@ import pandas as pd
 import numpy as np
 from typing import List
 
-from ..strategy.indicators import sma, ema, rsi, atr, macd, bollinger_bands
+from ..strategy.indicators import rsi, atr, macd, bollinger_bands
+from ..strategy._kernels import atr_nb, macd_nb, rsi_nb
+from ._kernels import rolling_std_nb, sma_nb, valid_rows_nb
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """
+    Rellena NaN con el último valor válido (como `Series.ffill()`).
+    
+    Args:
+        values: Array float64.
+        
+    Returns:
+        Array rellenado (NaN iniciales se mantienen); el mismo array si no hay NaN.
+    """
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    last_valid = np.where(mask, 0, np.arange(values.size))
+    np.maximum.accumulate(last_valid, out=last_valid)
+    return values[last_valid]
+
+
+def _pct_change(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Ratio values[t] / values[t - period] - 1 sobre un array crudo.
+    
+    Sin relleno de NaN (`pct_change(period, fill_method=None)`); para el
+    default de pandas 2.x (pad) pasar `_ffill(values)`.
+    
+    Args:
+        values: Precios como float64.
+        period: Desfase en períodos (> 0).
+        
+    Returns:
+        Array con values[t] / values[t - period] - 1 (NaN en los primeros).
+    """
+    out = np.full(values.shape, np.nan)
+    if period < values.size:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(values[period:], values[:-period], out=out[period:])
+        out[period:] -= 1.0
+    return out
+
+
+def _rolling_means(values: np.ndarray, periods: List[int]) -> dict[int, np.ndarray] | None:
+    """
+    Medias móviles simples para varios períodos desde un único cumsum.
+    
+    Args:
+        values: Serie como float64.
+        periods: Ventanas a calcular.
+        
+    Returns:
+        Dict período -> array (NaN hasta completar la ventana), o None si
+        hay NaN (el cumsum los propagaría; el caller usa sma_nb).
+    """
+    if np.isnan(values).any():
+        return None
+
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    means = {}
+    for period in periods:
+        out = np.full(values.shape, np.nan)
+        if period <= values.size:
+            out[period - 1:] = (cumsum[period:] - cumsum[:-period]) / period
+        means[period] = out
+    return means
+
+
+def _bb_band_positions(columns: pd.Index) -> tuple[int, int] | tuple[()]:
+    """
+    Ubica las bandas inferior y superior en la salida de `bollinger_bands`.
+    
+    Args:
+        columns: Columnas devueltas por pandas-ta (BBL_*, BBM_*, BBU_*, ...).
+        
+    Returns:
+        Tupla (posición BBL, posición BBU), o tupla vacía si falta alguna.
+    """
+    lower = [i for i, name in enumerate(columns) if "BBL" in name]
+    upper = [i for i, name in enumerate(columns) if "BBU" in name]
+    if lower and upper:
+        return lower[0], upper[0]
+    return ()
 
 
 class FeatureEngineer:
@@ -12,8 +96,8 @@ class FeatureEngineer:
     Genera features técnicos para modelos de ML.
     
     CRÍTICO: Todos los features en tiempo t usan SOLO información hasta t-1.
-    Esto se logra calculando features normalmente y luego haciendo .shift(1)
-    al DataFrame completo al final.
+    Esto se logra calculando features normalmente y luego desplazando una
+    fila (equivalente a .shift(1)) la matriz completa al final.
     
     Features incluidos:
     - Retornos (1, 5, 10, 20 períodos)
@@ -25,12 +109,16 @@ class FeatureEngineer:
     - Volume features
     """
 
+    MOMENTUM_PERIODS = (5, 10, 20)
+    MACD_PERIODS = (12, 26, 9)  # (fast, slow, signal)
+
     def __init__(
         self,
         sma_periods: List[int] = [5, 10, 20, 50],
         rsi_period: int = 14,
         atr_period: int = 14,
         lookback_periods: List[int] = [1, 5, 10, 20],
+        dtype: np.dtype | type = np.float64,
     ):
         """
         Args:
@@ -38,11 +126,23 @@ class FeatureEngineer:
             rsi_period: Período para RSI.
             atr_period: Período para ATR.
             lookback_periods: Períodos para retornos históricos.
+            dtype: Tipo de la matriz de features (float64 o float32). Los
+                indicadores se calculan siempre en float64; float32 solo
+                reduce a la mitad la matriz que recibe el modelo.
+                
+        Raises:
+            ValueError: Si dtype no es de punto flotante.
         """
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != "f":
+            raise ValueError(f"dtype must be a floating type, got {self.dtype}")
         self.sma_periods = sma_periods
         self.rsi_period = rsi_period
         self.atr_period = atr_period
         self.lookback_periods = lookback_periods
+        # Posiciones (BBL, BBU) en el DataFrame de bollinger_bands; los
+        # parámetros de BB son fijos, así que se buscan una sola vez
+        self._bb_positions: tuple[int, int] | tuple[()] | None = None
 
     def create_features(self, prices: pd.DataFrame) -> pd.DataFrame:
         """
@@ -50,7 +150,7 @@ class FeatureEngineer:
         
         CRÍTICO: 
         1. Calculamos features con precios normales (sin shift)
-        2. Al FINAL hacemos df.shift(1) para que feature[t] use datos hasta t-1
+        2. Al FINAL desplazamos todo una fila (shift(1)) para que feature[t] use datos hasta t-1
         
         Esto es correcto porque:
         - sma(close, 20) en día t usa close[t-19:t+1] (incluye t)
@@ -63,88 +163,143 @@ class FeatureEngineer:
         Returns:
             DataFrame con features calculados, mismo índice que prices.
         """
-        df = pd.DataFrame(index=prices.index)
-        
         # Usamos precios SIN shift - el shift se hace al final
         close = prices["close"]
         high = prices["high"]
         low = prices["low"]
         volume = prices["volume"] if "volume" in prices.columns else None
+        close_values = close.to_numpy(dtype=np.float64)
+        high_values = high.to_numpy(dtype=np.float64)
+        low_values = low.to_numpy(dtype=np.float64)
+        n_bars = close_values.size
 
-        # 1. Retornos históricos
+        # Kernels Numba de RSI/ATR/MACD: mismas fórmulas que pandas-ta, pero solo
+        # sin NaN y con historia suficiente (si no, pandas-ta/fallback)
+        use_kernels = bool(
+            np.isfinite(close_values).all()
+            and np.isfinite(high_values).all()
+            and np.isfinite(low_values).all()
+        )
+
+        # Columnas en orden; el DataFrame se construye una sola vez al final
+        cols: dict[str, np.ndarray] = {}
+
+        # 1. Retornos históricos. pct_change de pandas rellena NaN hacia
+        # adelante antes del ratio y momentum (close / close.shift) no: sin NaN
+        # coinciden y comparten un ratio por período
+        padded = _ffill(close_values)
+        ratios = {
+            period: _pct_change(padded, period)
+            for period in {1, *self.lookback_periods, *self.MOMENTUM_PERIODS}
+        }
+        if padded is close_values:
+            momentum = ratios
+        else:
+            momentum = {p: _pct_change(close_values, p) for p in self.MOMENTUM_PERIODS}
+        returns_1 = ratios[1]  # Reutilizado por return_1d y volatilidad
         for period in self.lookback_periods:
-            df[f"return_{period}d"] = close.pct_change(period)
+            cols[f"return_{period}d"] = ratios[period]
 
-        # 2. Medias móviles y ratios
+        # 2. Medias móviles y ratios (todas las SMAs desde un único cumsum)
+        means = _rolling_means(close_values, self.sma_periods)
+        if means is None:
+            # Con NaN: ventana deslizante Numba (mismo criterio NaN que rolling)
+            means = {period: sma_nb(close_values, period) for period in self.sma_periods}
         for period in self.sma_periods:
-            ma = sma(close, period)
-            df[f"sma_{period}"] = ma
-            df[f"close_to_sma_{period}"] = close / ma - 1  # Distancia relativa
+            ma = means[period]
+            cols[f"sma_{period}"] = ma
+            cols[f"close_to_sma_{period}"] = close_values / ma - 1  # Distancia relativa
 
         # 3. Cruces de MAs (features binarios para cada par)
         if len(self.sma_periods) >= 2:
-            fast_ma = sma(close, self.sma_periods[0])
-            slow_ma = sma(close, self.sma_periods[-1])
-            df["ma_cross"] = (fast_ma > slow_ma).astype(int)
-            df["ma_diff"] = (fast_ma - slow_ma) / slow_ma
+            fast_ma = means[self.sma_periods[0]]
+            slow_ma = means[self.sma_periods[-1]]
+            cols["ma_cross"] = fast_ma > slow_ma  # bool: se castea a 0/1 al copiar a la matriz
+            cols["ma_diff"] = (fast_ma - slow_ma) / slow_ma
 
         # 4. RSI
-        df["rsi"] = rsi(close, self.rsi_period)
-        df["rsi_oversold"] = (df["rsi"] < 30).astype(int)
-        df["rsi_overbought"] = (df["rsi"] > 70).astype(int)
+        if use_kernels and n_bars >= self.rsi_period:
+            rsi_values = rsi_nb(close_values, self.rsi_period)
+        else:
+            rsi_values = rsi(close, self.rsi_period).to_numpy()
+        cols["rsi"] = rsi_values
+        cols["rsi_oversold"] = rsi_values < 30
+        cols["rsi_overbought"] = rsi_values > 70
 
         # 5. Volatilidad
-        df["atr"] = atr(high, low, close, self.atr_period)
-        df["atr_pct"] = df["atr"] / close  # ATR como % del precio
+        if use_kernels and n_bars > self.atr_period:
+            atr_values = atr_nb(high_values, low_values, close_values, self.atr_period)
+        else:
+            atr_values = atr(high, low, close, self.atr_period).to_numpy()
+        cols["atr"] = atr_values
+        cols["atr_pct"] = atr_values / close_values  # ATR como % del precio
         
         for period in [5, 20]:
-            df[f"volatility_{period}d"] = close.pct_change().rolling(period).std()
+            cols[f"volatility_{period}d"] = rolling_std_nb(returns_1, period)
 
-        # 6. MACD
-        macd_df = macd(close)
-        if macd_df is not None and not macd_df.empty:
-            macd_cols = macd_df.columns.tolist()
-            if len(macd_cols) >= 3:
-                df["macd"] = macd_df.iloc[:, 0]
-                df["macd_signal"] = macd_df.iloc[:, 2]
-                df["macd_hist"] = macd_df.iloc[:, 1]
+        # 6. MACD ([MACD, histogram, signal]; pandas-ta devuelve None sin historia)
+        fast, slow, signal = self.MACD_PERIODS
+        macd_values = None
+        if use_kernels and n_bars >= slow + signal - 1:
+            macd_values = macd_nb(close_values, fast, slow, signal)
+        else:
+            macd_df = macd(close, fast, slow, signal)
+            if macd_df is not None and not macd_df.empty and macd_df.shape[1] >= 3:
+                macd_values = macd_df.to_numpy(dtype=np.float64)
+        if macd_values is not None:
+            cols["macd"] = macd_values[:, 0]
+            cols["macd_signal"] = macd_values[:, 2]
+            cols["macd_hist"] = macd_values[:, 1]
 
         # 7. Bollinger Bands
         bb_df = bollinger_bands(close)
         if bb_df is not None and not bb_df.empty:
-            bb_cols = bb_df.columns.tolist()
-            lower_col = [c for c in bb_cols if "BBL" in c]
-            upper_col = [c for c in bb_cols if "BBU" in c]
+            if self._bb_positions is None:
+                self._bb_positions = _bb_band_positions(bb_df.columns)
             
-            if lower_col and upper_col:
-                bb_lower = bb_df[lower_col[0]]
-                bb_upper = bb_df[upper_col[0]]
+            if self._bb_positions:
+                bb_values = bb_df.to_numpy(dtype=np.float64)
+                lower_pos, upper_pos = self._bb_positions
+                bb_lower = bb_values[:, lower_pos]
+                bb_upper = bb_values[:, upper_pos]
                 bb_range = bb_upper - bb_lower
-                df["bb_position"] = (close - bb_lower) / bb_range  # 0-1
-                df["bb_width"] = bb_range / close
+                cols["bb_position"] = (close_values - bb_lower) / bb_range  # 0-1
+                cols["bb_width"] = bb_range / close_values
 
         # 8. Volume features
         if volume is not None:
-            df["volume_sma_20"] = sma(volume, 20)
-            df["volume_ratio"] = volume / df["volume_sma_20"]
-            df["volume_change"] = volume.pct_change()
+            volume_values = volume.to_numpy(dtype=np.float64)
+            volume_sma = sma_nb(volume_values, 20)
+            cols["volume_sma_20"] = volume_sma
+            cols["volume_ratio"] = volume_values / volume_sma
+            cols["volume_change"] = _pct_change(_ffill(volume_values), 1)
 
         # 9. Features de precio
-        df["high_low_range"] = (high - low) / close
-        df["close_position"] = (close - low) / (high - low)
+        hl_range = high_values - low_values
+        with np.errstate(divide="ignore", invalid="ignore"):  # high == low -> inf/NaN
+            cols["high_low_range"] = hl_range / close_values
+            cols["close_position"] = (close_values - low_values) / hl_range
 
-        # 10. Momentum
-        for period in [5, 10, 20]:
-            df[f"momentum_{period}d"] = close / close.shift(period) - 1
+        # 10. Momentum (mismo ratio que return_{period}d, ya calculado)
+        for period in self.MOMENTUM_PERIODS:
+            cols[f"momentum_{period}d"] = momentum[period]
 
-        # 🔥 CRÍTICO: Shiftear TODO el DataFrame al final
-        # Esto garantiza que feature[t] usa SOLO datos hasta t-1
-        df = df.shift(1)
+        # 🔥 CRÍTICO: Shiftear TODO al final (feature[t] usa SOLO datos hasta t-1).
+        # Cada columna se copia (y castea a self.dtype) ya desplazada una fila
+        # a una matriz Fortran,
+        # que pandas adopta como bloque sin copiar (en vez de consolidar el
+        # dict, y copiar de nuevo en shift(1) y en replace()).
+        matrix = np.empty((n_bars, len(cols)), dtype=self.dtype, order="F")
+        if n_bars:
+            matrix[0] = np.nan
+            with np.errstate(over="ignore"):  # float32: desbordes -> inf -> NaN abajo
+                for j, values in enumerate(cols.values()):
+                    matrix[1:, j] = values[:-1]
         
         # Limpiar infinitos que pueden generarse por división por cero
-        df = df.replace([np.inf, -np.inf], np.nan)
+        matrix[np.isinf(matrix)] = np.nan
 
-        return df
+        return pd.DataFrame(matrix, index=prices.index, columns=list(cols), copy=False)
 
     def create_target(
         self,
@@ -172,15 +327,20 @@ class FeatureEngineer:
             threshold: Umbral de retorno mínimo para considerar "subida".
             
         Returns:
-            Series con 1 (subirá) o 0 (bajará/lateral).
+            Series int8 con 1 (subirá) o 0 (bajará/lateral). Las últimas
+            'horizon' filas (sin precio futuro) quedan en 0.
         """
-        close = prices["close"]
-        future_price = close.shift(-horizon)
-        future_return = (future_price / close) - 1
+        close = prices["close"].to_numpy(dtype=np.float64)
+        target = np.zeros(close.size, dtype=np.int8)
         
-        target = (future_return > threshold).astype(int)
+        if 0 < horizon < close.size:
+            # Mismo orden de operaciones que (future / close) - 1, in-place
+            with np.errstate(divide="ignore", invalid="ignore"):
+                future_return = np.divide(close[horizon:], close[:-horizon])
+            future_return -= 1.0
+            target[:-horizon] = future_return > threshold
         
-        return target
+        return pd.Series(target, index=prices.index, name=prices["close"].name)
 
     def prepare_dataset(
         self,
@@ -210,9 +370,10 @@ class FeatureEngineer:
         target = self.create_target(prices, horizon, threshold)
 
         if dropna:
-            combined = pd.concat([features, target.rename("target")], axis=1)
-            combined = combined.dropna()
-            features = combined.drop("target", axis=1)
-            target = combined["target"]
+            # Máscara NumPy en vez de concat + dropna + split (evita copiar dos veces)
+            valid = valid_rows_nb(features.to_numpy())
+            valid &= target.notna().to_numpy()
+            features = features.iloc[valid]
+            target = target.iloc[valid].rename("target")
 
         return features, target
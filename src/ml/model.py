@@ -7,14 +7,20 @@ from pathlib import Path
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
 from xgboost import XGBClassifier
 from lightgbm import LGBMClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from sklearn.preprocessing import StandardScaler
 
 from ..strategy.base import Strategy, SignalResult
+from ._kernels import valid_rows_nb
 from .features import FeatureEngineer
 
 
@@ -34,6 +40,8 @@ class MLModel:
     Wrapper para modelos de ML de clasificación.
     
     Soporta:
+    - HistGradientBoosting (sklearn, default: binning de features en
+      histogramas, split-finding mucho más rápido que RandomForest)
     - RandomForest
     - GradientBoosting (sklearn)
     - XGBoost
@@ -41,29 +49,49 @@ class MLModel:
     """
 
     SUPPORTED_MODELS = {
+        "hist_gbm": HistGradientBoostingClassifier,
         "random_forest": RandomForestClassifier,
         "gradient_boosting": GradientBoostingClassifier,
         "xgboost": XGBClassifier,
         "lightgbm": LGBMClassifier,
     }
 
+    # Árboles: splits invariantes a escala monótona, StandardScaler no aporta
+    TREE_MODELS = frozenset(SUPPORTED_MODELS)
+
+    # Parámetros para entrenar en GPU (solo modelos con backend CUDA/OpenCL)
+    GPU_PARAMS = {
+        "xgboost": {"tree_method": "hist", "device": "cuda"},
+        "lightgbm": {"device_type": "gpu"},
+    }
+
     def __init__(
         self,
-        model_type: str = "random_forest",
+        model_type: str = "hist_gbm",
         model_params: Optional[dict] = None,
-        scale_features: bool = True,
+        scale_features: Optional[bool] = None,
+        use_gpu: bool = False,
     ):
         """
         Args:
-            model_type: Tipo de modelo ('random_forest', 'xgboost', etc).
+            model_type: Tipo de modelo ('hist_gbm', 'random_forest', 'xgboost', etc).
             model_params: Parámetros para el modelo.
-            scale_features: Si escalar features antes de entrenar.
+            scale_features: Si escalar features antes de entrenar. None (default)
+                escala solo si el modelo no es de árboles, ahorrando una
+                transformación N×F en cada fit/predict.
+            use_gpu: Si entrenar en GPU (XGBoost con CUDA, LightGBM compilado
+                con soporte GPU). Los demás modelos lo ignoran; los
+                parámetros explícitos en model_params tienen prioridad.
         """
         if model_type not in self.SUPPORTED_MODELS:
             raise ValueError(f"Model type must be one of {list(self.SUPPORTED_MODELS.keys())}")
+        if scale_features is None:
+            scale_features = model_type not in self.TREE_MODELS
 
         self.model_type = model_type
         self.model_params = model_params or self._default_params(model_type)
+        if use_gpu and model_type in self.GPU_PARAMS:
+            self.model_params = {**self.GPU_PARAMS[model_type], **self.model_params}
         self.scale_features = scale_features
 
         self._model = None
@@ -73,7 +101,16 @@ class MLModel:
 
     def _default_params(self, model_type: str) -> dict:
         """Parámetros por defecto para cada tipo de modelo."""
-        if model_type == "random_forest":
+        if model_type == "hist_gbm":
+            return {
+                "max_iter": 100,
+                "max_leaf_nodes": 31,
+                "learning_rate": 0.1,
+                "min_samples_leaf": 20,
+                "random_state": 42,
+                "class_weight": "balanced",
+            }
+        elif model_type == "random_forest":
             return {
                 "n_estimators": 100,
                 "max_depth": 10,
@@ -109,6 +146,12 @@ class MLModel:
                 "random_state": 42,
                 "n_jobs": -1,
                 "class_weight": "balanced",
+                # Histogramas más chicos: features suaves no necesitan 255 bins
+                "max_bin": 63,
+                "min_data_in_bin": 50,
+                "feature_pre_filter": False,
+                "force_col_wise": True,  # Evita el pre-scan fila/columna en cada fit
+                "verbosity": -1,
             }
         return {}
 
@@ -172,20 +215,29 @@ class MLModel:
         if cv_folds > 1 and len(X_train) >= cv_folds * 10:
             tscv = TimeSeriesSplit(n_splits=cv_folds)
             
-            # Crear pipeline para que scaler se fit en cada fold
-            steps = []
             if self.scale_features:
-                steps.append(("scaler", StandardScaler()))
-            steps.append(("model", model_class(**self.model_params)))
-            
-            pipe = Pipeline(steps)
-            cv_scores = cross_val_score(pipe, X_train, y_train, cv=tscv)
-            metrics.cv_scores = cv_scores.tolist()
+                # Scaler por fold (sin leakage) desde sumas acumuladas compartidas
+                metrics.cv_scores = _prefix_scaled_cv_scores(
+                    model_class, self.model_params, X_train, y_train, tscv
+                )
+            else:
+                pipe = Pipeline([("model", model_class(**self.model_params))])
+                cv_scores = cross_val_score(pipe, X_train, y_train, cv=tscv)
+                metrics.cv_scores = cv_scores.tolist()
 
         # Feature importance
         if hasattr(self._model, "feature_importances_"):
             importances = self._model.feature_importances_
             metrics.feature_importance = dict(zip(self._feature_names, importances))
+        elif len(X_test) > 0:
+            # HistGradientBoosting no expone feature_importances_: importancia
+            # por permutación sobre el test set (fuera de la muestra de train)
+            result = permutation_importance(
+                self._model, X_test_scaled, y_test, n_repeats=5, random_state=42
+            )
+            metrics.feature_importance = dict(
+                zip(self._feature_names, result.importances_mean)
+            )
 
         return metrics
 
@@ -245,9 +297,12 @@ class MLModel:
             "feature_names": self._feature_names,
             "model_type": self.model_type,
             "model_params": self.model_params,
+            "scale_features": self.scale_features,
         }
+        # Protocolo 5: arrays NumPy (hojas de los árboles) en frames grandes,
+        # sin la copia extra del protocolo 4 por defecto
         with open(path, "wb") as f:
-            pickle.dump(state, f)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     @classmethod
     def load(cls, path: Path | str) -> "MLModel":
@@ -258,6 +313,8 @@ class MLModel:
         instance = cls(
             model_type=state["model_type"],
             model_params=state["model_params"],
+            # Modelos guardados antes de este flag siempre escalaban
+            scale_features=state.get("scale_features", state["scaler"] is not None),
         )
         instance._model = state["model"]
         instance._scaler = state["scaler"]
@@ -266,6 +323,80 @@ class MLModel:
         return instance
 
 
+def _prefix_scaled_cv_scores(
+    model_class: type,
+    model_params: dict,
+    X: pd.DataFrame,
+    y: pd.Series,
+    tscv,
+) -> list[float]:
+    """
+    Accuracy por fold de TimeSeriesSplit con estandarización sin leakage.
+    
+    Los sets de entrenamiento de TimeSeriesSplit son prefijos [0, end), así
+    que media y varianza de cada fold salen de un único cumsum de X y X²
+    en vez de un StandardScaler.fit por fold. Mismo criterio que
+    StandardScaler: varianza poblacional y escala 1 si es 0.
+    
+    Args:
+        model_class: Clase del estimador.
+        model_params: Parámetros del estimador.
+        X: Features de entrenamiento.
+        y: Target de entrenamiento.
+        tscv: TimeSeriesSplit.
+        
+    Returns:
+        Lista de accuracy por fold (igual que cross_val_score).
+    """
+    values = X.to_numpy(dtype=np.float64)
+    target = y.to_numpy()
+    sums = np.cumsum(values, axis=0)
+    sums_sq = np.cumsum(values * values, axis=0)
+    
+    scores = []
+    for train_idx, val_idx in tscv.split(values):
+        n = train_idx[-1] + 1
+        mean = sums[n - 1] / n
+        var = np.maximum(sums_sq[n - 1] / n - mean * mean, 0.0)
+        scale = np.sqrt(var)
+        scale[scale == 0.0] = 1.0
+        
+        model = model_class(**model_params)
+        model.fit((values[:n] - mean) / scale, target[:n])
+        scores.append(float(model.score((values[val_idx] - mean) / scale, target[val_idx])))
+    return scores
+
+
+_OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def _prices_key(prices: pd.DataFrame) -> tuple:
+    """
+    Clave de contenido para un DataFrame de precios.
+    
+    Hashea los bytes de las columnas OHLCV (las que usa FeatureEngineer)
+    junto con los extremos del índice: dos DataFrames con los mismos datos comparten clave aunque sean
+    objetos distintos, y una modificación in-place cambia la clave.
+    
+    Args:
+        prices: DataFrame OHLCV.
+        
+    Returns:
+        Tupla hasheable (n filas, primer y último timestamp, columnas, hash).
+    """
+    columns = [c for c in _OHLCV_COLUMNS if c in prices.columns]
+    if prices.empty:
+        return (0, tuple(columns))
+    values = np.ascontiguousarray(prices[columns].to_numpy(dtype=np.float64))
+    return (
+        len(prices),
+        prices.index[0],
+        prices.index[-1],
+        tuple(columns),
+        hash(values.tobytes()),
+    )
+
+
 class MLStrategy(Strategy):
     """
     Estrategia basada en modelo ML.
@@ -292,6 +423,8 @@ class MLStrategy(Strategy):
         self.feature_engineer = feature_engineer
         self.entry_threshold = entry_threshold
         self.exit_threshold = exit_threshold
+        # Última matriz de features calculada: (clave de precios, DataFrame)
+        self._features_cache: tuple[tuple, pd.DataFrame] | None = None
 
     @property
     def name(self) -> str:
@@ -305,6 +438,25 @@ class MLStrategy(Strategy):
             "exit_threshold": self.exit_threshold,
         }
 
+    def _cached_features(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        create_features con memo de una entrada por contenido de precios.
+        
+        Llamadas repetidas con los mismos precios (reruns del dashboard,
+        loops en vivo sin vela nueva) no recalculan indicadores. No se
+        extiende incrementalmente al agregar velas: RSI/ATR/MACD son EMAs
+        con memoria infinita, así que recalcular solo la cola no daría los
+        mismos valores.
+        
+        Returns:
+            Copia de las features (el caller les agrega columnas).
+        """
+        key = (id(self.feature_engineer), _prices_key(prices))
+        if self._features_cache is None or self._features_cache[0] != key:
+            features = self.feature_engineer.create_features(prices)
+            self._features_cache = (key, features)
+        return self._features_cache[1].copy()
+
     def generate_signals(self, prices: pd.DataFrame) -> SignalResult:
         """
         Genera señales basadas en predicciones del modelo.
@@ -317,38 +469,32 @@ class MLStrategy(Strategy):
         """
         self.validate_prices(prices)
 
-        # Generar features
-        features = self.feature_engineer.create_features(prices)
+        # Generar features (o reutilizarlas si los precios no cambiaron)
+        features = self._cached_features(prices)
         
         # Eliminar NaN (modelo no puede predecir con NaN)
-        valid_mask = ~features.isna().any(axis=1)
-        features_clean = features[valid_mask]
+        valid_mask = valid_rows_nb(features.to_numpy())
 
-        # Inicializar señales como False
-        entries = pd.Series(False, index=prices.index)
-        exits = pd.Series(False, index=prices.index)
+        # Inicializar señales como False (arrays crudos, posicionales)
+        entries = np.zeros(len(prices), dtype=bool)
+        exits = np.zeros(len(prices), dtype=bool)
 
-        if len(features_clean) > 0:
+        if valid_mask.any():
             # Predecir probabilidades
-            proba = self.model.predict_proba(features_clean)
-            proba_series = pd.Series(proba, index=features_clean.index)
+            proba = self.model.predict_proba(features[valid_mask])
 
             # Entry: probabilidad > entry_threshold
             # Exit: probabilidad < exit_threshold
-            entries.loc[features_clean.index] = proba_series > self.entry_threshold
-            exits.loc[features_clean.index] = proba_series < self.exit_threshold
+            entries[valid_mask] = proba > self.entry_threshold
+            exits[valid_mask] = proba < self.exit_threshold
             
             # 🔥 Limpiar conflictos: si entries y exits son True simultáneamente, priorizar entries
-            conflict_mask = entries & exits
-            exits = exits & ~conflict_mask
+            exits &= ~entries
 
             # Agregar probabilidad a features
-            features["ml_probability"] = np.nan
-            features.loc[features_clean.index, "ml_probability"] = proba
-        
-        # Forzar dtype bool para evitar problemas con pandas
-        entries = entries.astype(bool)
-        exits = exits.astype(bool)
+            ml_probability = np.full(len(prices), np.nan)
+            ml_probability[valid_mask] = proba
+            features["ml_probability"] = ml_probability
 
         signals = pd.DataFrame({"entries": entries, "exits": exits}, index=prices.index)
 
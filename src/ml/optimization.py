@@ -6,10 +6,12 @@ import numpy as np
 from typing import Dict, Any, Optional
 from dataclasses import asdict
 
-from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import TimeSeriesSplit
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.base import clone
+from threadpoolctl import threadpool_limits
 
 from .model import MLModel
 
@@ -17,17 +19,24 @@ from .model import MLModel
 class ModelOptimizer:
     """
     Optimizador de hiperparámetros usando Optuna.
-    Soporta RF, XGBoost, LightGBM.
+    Soporta HistGradientBoosting, RF, GradientBoosting, XGBoost, LightGBM.
     """
 
-    def __init__(self, n_trials: int = 50, cv_folds: int = 5):
+    def __init__(self, n_trials: int = 50, cv_folds: int = 5, n_jobs: int = -1):
         """
         Args:
             n_trials: Número de intentos de optimización.
             cv_folds: Folds para TimeSeriesSplit cross-validation.
+            n_jobs: Trials de Optuna en paralelo (-1 = un hilo por CPU).
+                Con más de uno, cada trial entrena y evalúa en un solo hilo
+                (n_jobs=1 y pools OpenMP/BLAS limitados) para no competir
+                por los cores. Ojo: el límite de OpenMP/BLAS es global, así
+                que mientras corre optimize() aplica a todo el proceso.
+                Con 1 se paraleliza dentro del trial (modelo y CV) como antes.
         """
         self.n_trials = n_trials
         self.cv_folds = cv_folds
+        self.n_jobs = n_jobs
 
     def optimize(
         self,
@@ -48,21 +57,26 @@ class ModelOptimizer:
         Returns:
             Diccionario con los mejores parámetros encontrados.
         """
+        # El paralelismo va en un solo nivel: entre trials o dentro de cada uno
+        inner_jobs = -1 if self.n_jobs == 1 else 1
+        
         # Definir función objetivo para Optuna
         def objective(trial):
             params = self._suggest_params(trial, model_type)
+            if "n_jobs" in params:
+                params["n_jobs"] = inner_jobs
             
             # Instanciar modelo base
             model_class = MLModel.SUPPORTED_MODELS[model_type]
             model = model_class(**params)
             
-            # Pipeline con scaler (importante para evitar leakage)
-            # Para árboles a veces no es crítico escalar, pero es buena práctica
-            # especialmente modelos sensibles a magnitud.
-            pipeline = Pipeline([
-                ("scaler", StandardScaler()),
-                ("model", model)
-            ])
+            # Pipeline con scaler (dentro del CV para evitar leakage) solo si
+            # el modelo es sensible a magnitud; los árboles no lo necesitan
+            steps = []
+            if model_type not in MLModel.TREE_MODELS:
+                steps.append(("scaler", StandardScaler()))
+            steps.append(("model", model))
+            pipeline = Pipeline(steps)
             
             # CV temporal
             # OJO: Se usaba len(X) >= cv_folds * 10 en MLModel, aquí asumimos datasize suficiente
@@ -73,24 +87,57 @@ class ModelOptimizer:
             # Para imbalanced data, 'f1_weighted' o 'f1_macro' puede ser mejor,
             # pero mantendremos simple 'f1' (clase positiva 1) si es binaria.
             scoring = metric if metric != "f1" else "f1"  # Simplificación
+            scorer = get_scorer(scoring)
             
             try:
-                scores = cross_val_score(
-                    pipeline, X, y, cv=tscv, scoring=scoring, n_jobs=-1
-                )
-                return scores.mean()
+                # Folds en orden, reportando la media parcial: MedianPruner
+                # corta el trial si ya va peor que la mediana en ese fold
+                scores = []
+                for fold, (train_idx, val_idx) in enumerate(tscv.split(X)):
+                    pipeline.fit(X.iloc[train_idx], y.iloc[train_idx])
+                    scores.append(scorer(pipeline, X.iloc[val_idx], y.iloc[val_idx]))
+                    trial.report(float(np.mean(scores)), fold)
+                    if trial.should_prune():
+                        raise optuna.TrialPruned()
+                return float(np.mean(scores))
+            except optuna.TrialPruned:
+                raise
             except Exception as e:
                 # Si falla una combinación por alguna razón, retornamos valor bajo
                 return 0.0
 
-        study = optuna.create_study(direction="maximize")
-        study.optimize(objective, n_trials=self.n_trials)
+        study = optuna.create_study(
+            direction="maximize",
+            pruner=optuna.pruners.MedianPruner(n_warmup_steps=1),
+        )
+        if self.n_jobs == 1:
+            study.optimize(objective, n_trials=self.n_trials, n_jobs=1)
+        else:
+            # Modelos sin parámetro n_jobs (hist_gbm, gradient_boosting) abren
+            # igual un pool OpenMP/BLAS por fit: limitarlo a 1 hilo mientras
+            # corren los trials concurrentes. threadpoolctl no tiene límites
+            # por hilo: acotar cada fit haría que los trials restauren el
+            # límite bajo los fits de otros. Se limita el PROCESO completo
+            # durante el estudio (también otros hilos, ej. la app Streamlit).
+            with threadpool_limits(limits=1):
+                study.optimize(objective, n_trials=self.n_trials, n_jobs=self.n_jobs)
 
         return study.best_params
 
     def _suggest_params(self, trial: optuna.Trial, model_type: str) -> Dict[str, Any]:
         """Sugiere parámetros según el tipo de modelo."""
-        if model_type == "random_forest":
+        if model_type == "hist_gbm":
+            return {
+                "max_iter": trial.suggest_int("max_iter", 50, 300),
+                "max_leaf_nodes": trial.suggest_int("max_leaf_nodes", 15, 127),
+                "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+                "min_samples_leaf": trial.suggest_int("min_samples_leaf", 5, 100),
+                "l2_regularization": trial.suggest_float("l2_regularization", 1e-8, 10.0, log=True),
+                "random_state": 42,
+                "class_weight": "balanced",
+            }
+            
+        elif model_type == "random_forest":
             return {
                 "n_estimators": trial.suggest_int("n_estimators", 50, 300),
                 "max_depth": trial.suggest_int("max_depth", 3, 20),
@@ -133,7 +180,11 @@ class ModelOptimizer:
                 "random_state": 42,
                 "n_jobs": -1,
                 "class_weight": "balanced",
-                # "verbosity": -1,
+                "max_bin": 63,
+                "min_data_in_bin": 50,
+                "feature_pre_filter": False,
+                "force_col_wise": True,
+                "verbosity": -1,
             }
             
         return {}
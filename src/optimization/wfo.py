@@ -14,15 +14,28 @@ Ejemplo de uso:
     print(result.oos_sharpe)  # Sharpe out-of-sample agregado
 """
 
+import itertools
+import math
+import os
+import shutil
+import tempfile
+import uuid
 from dataclasses import dataclass, field
-from typing import Type, Dict, Any, List, Tuple
+from typing import Type, Dict, Any, Callable, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 import optuna
-from optuna.samplers import TPESampler
+from joblib import Parallel, delayed, effective_n_jobs
+from optuna.samplers import BaseSampler, CmaEsSampler, TPESampler
+from optuna.trial import FrozenTrial, TrialState
+
+try:  # Opcional: backend de CmaEsSampler para espacios continuos
+    import cmaes
+except ImportError:  # pragma: no cover - depende del entorno
+    cmaes = None
 
 from ..strategy.base import Strategy
-from ..backtest import BacktestEngine, TradingCosts
+from ..backtest import BacktestEngine, PriceArrays, TradingCosts
 
 
 @dataclass
@@ -62,6 +75,99 @@ class WFOResult:
         }
 
 
+def _run_fold(
+    optimizer: "WalkForwardOptimizer",
+    fold_idx: int,
+    train_data: pd.DataFrame,
+    test_data: pd.DataFrame,
+    strategy_class: Type[Strategy],
+    param_space: Dict[str, Tuple[int, int]],
+    trial_jobs: int = 1,
+    prior_trials: Optional[List[FrozenTrial]] = None,
+) -> Tuple[WFOFold, List[FrozenTrial]]:
+    """
+    Optimiza una ventana en train y la evalúa en train/test.
+    
+    A nivel de módulo para que joblib (loky) pueda enviarla a otro proceso.
+    
+    Returns:
+        Tupla (WFOFold, trials completos de esta ventana).
+    """
+    # Optimizar en train
+    best_params, trials = optimizer._optimize_fold(
+        train_data, strategy_class, param_space,
+        n_jobs=trial_jobs, prior_trials=prior_trials,
+    )
+    
+    # Evaluar en train y test
+    train_metrics = optimizer._backtest_strategy(train_data, strategy_class, best_params)
+    test_metrics = optimizer._backtest_strategy(test_data, strategy_class, best_params)
+    
+    fold = WFOFold(
+        fold_idx=fold_idx,
+        train_start=train_data.index.min(),
+        train_end=train_data.index.max(),
+        test_start=test_data.index.min(),
+        test_end=test_data.index.max(),
+        best_params=best_params,
+        train_sharpe=train_metrics["sharpe"],
+        test_sharpe=test_metrics["sharpe"],
+        train_return=train_metrics["return"],
+        test_return=test_metrics["return"],
+    )
+    return fold, trials
+
+
+def _make_sampler(
+    seed: int,
+    n_startup_trials: int,
+    param_space: Dict[str, Tuple[Any, Any]],
+) -> BaseSampler:
+    """
+    Sampler de Optuna según el tipo de espacio de parámetros.
+    
+    Espacios totalmente continuos usan CMA-ES (si `cmaes` está instalado),
+    que converge en menos trials que TPE. El resto usa TPE multivariado con
+    24 candidatos EI: con warm-start la historia crece ventana a ventana y
+    eso acota el costo por trial del sampler. Los espacios enteros con no más
+    combinaciones que n_trials no llegan aquí (grid search en `_optimize_fold`).
+    """
+    continuous = all(
+        isinstance(low, float) and isinstance(high, float)
+        for low, high in param_space.values()
+    )
+    if continuous and cmaes is not None:
+        return CmaEsSampler(seed=seed, n_startup_trials=n_startup_trials)
+    return TPESampler(
+        seed=seed,
+        n_startup_trials=n_startup_trials,
+        n_ei_candidates=24,
+        multivariate=True,
+    )
+
+
+def _run_trials(
+    optimizer: "WalkForwardOptimizer",
+    storage: str,
+    study_name: str,
+    train_data: pd.DataFrame,
+    strategy_class: Type[Strategy],
+    param_space: Dict[str, Tuple[int, int]],
+    n_trials: int,
+    seed: int,
+    n_startup_trials: int = 5,
+) -> None:
+    """Worker: carga el estudio compartido (SQLite) y corre su cuota de trials."""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=storage,
+        sampler=_make_sampler(seed, n_startup_trials, param_space),
+    )
+    objective = optimizer._make_objective(train_data, strategy_class, param_space)
+    study.optimize(objective, n_trials=n_trials, show_progress_bar=False)
+
+
 class WalkForwardOptimizer:
     """
     Walk-Forward Optimization con Optuna.
@@ -72,14 +178,29 @@ class WalkForwardOptimizer:
     3. Registra estabilidad de parámetros
     
     Detecta overfitting comparando rendimiento train vs test.
+    
+    Las ventanas son independientes, así que se procesan en paralelo en
+    procesos separados (joblib/loky) cuando n_jobs != 1.
+    
+    Si param_space es entero y tiene a lo sumo n_trials combinaciones, cada
+    ventana se resuelve con grid search exhaustivo: cuesta como mucho los
+    backtests pedidos y encuentra el óptimo exacto. Espacios más grandes usan
+    el sampler con exactamente n_trials trials.
     """
     
+    # Warm-start: sobre MAX_PRIOR_TRIALS se inyectan solo los PRIOR_TOP_TRIALS mejores
+    MAX_PRIOR_TRIALS = 200
+    PRIOR_TOP_TRIALS = 50
+    
     def __init__(
         self,
         n_splits: int = 5,
         train_pct: float = 0.7,
         n_trials: int = 30,
         metric: str = "sharpe",
+        n_jobs: int = 1,
+        warm_start: bool = True,
+        parallel_trials: bool = False,
     ):
         """
         Args:
@@ -87,11 +208,31 @@ class WalkForwardOptimizer:
             train_pct: Proporción de cada ventana para training.
             n_trials: Trials de Optuna por ventana.
             metric: Métrica a optimizar ('sharpe', 'return', 'sortino').
+            n_jobs: Procesos para ventanas/trials (1 = secuencial en el
+                proceso actual, -1 = todos los cores). Sin parallel_trials
+                el resultado no depende de este valor.
+            warm_start: Inyectar en cada ventana los trials de las anteriores
+                para que TPE no repita la exploración aleatoria. Obliga a
+                recorrer las ventanas en orden.
+            parallel_trials: Repartir también los trials de cada ventana entre
+                procesos (estudio compartido en SQLite). Más rápido, pero NO
+                determinista: los workers intercalan trials según el scheduling
+                y los parámetros elegidos cambian entre corridas y con n_jobs.
+                Con False cada ventana usa un estudio en memoria con semilla
+                fija y solo las ventanas se paralelizan.
         """
         self.n_splits = n_splits
         self.train_pct = train_pct
         self.n_trials = n_trials
         self.metric = metric
+        self.n_jobs = n_jobs
+        self.warm_start = warm_start
+        self.parallel_trials = parallel_trials
+        # BacktestEngine no guarda estado entre corridas: una instancia basta
+        self._engine = BacktestEngine(
+            initial_capital=10000,
+            costs=TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
+        )
     
     def _create_folds(
         self, prices: pd.DataFrame
@@ -105,14 +246,11 @@ class WalkForwardOptimizer:
             start_idx = i * fold_size
             end_idx = (i + 1) * fold_size if i < self.n_splits - 1 else n
             
-            fold_data = prices.iloc[start_idx:end_idx]
-            train_size = int(len(fold_data) * self.train_pct)
-            
-            train_data = fold_data.iloc[:train_size]
-            test_data = fold_data.iloc[train_size:]
-            
-            if len(train_data) > 50 and len(test_data) > 10:
-                folds.append((train_data, test_data))
+            # Límites enteros primero: se corta `prices` una vez por parte
+            # (vistas posicionales) y solo para ventanas válidas
+            split_idx = start_idx + int((end_idx - start_idx) * self.train_pct)
+            if split_idx - start_idx > 50 and end_idx - split_idx > 10:
+                folds.append((prices.iloc[start_idx:split_idx], prices.iloc[split_idx:end_idx]))
         
         return folds
     
@@ -121,33 +259,82 @@ class WalkForwardOptimizer:
         prices: pd.DataFrame,
         strategy_class: Type[Strategy],
         params: Dict[str, Any],
+        quick: bool = False,
+        indicator_cache: Optional[dict] = None,
+        arrays: Optional[PriceArrays] = None,
     ) -> Dict[str, float]:
-        """Ejecuta backtest y retorna métricas."""
+        """
+        Ejecuta backtest y retorna métricas.
+        
+        Con quick=True usa el simulador Numba de BacktestEngine (mismas
+        métricas sin construir el Portfolio de vectorbt); es el que corre en
+        cada trial de Optuna. La evaluación final de cada ventana usa el motor
+        completo. indicator_cache se asigna a la estrategia (ver
+        Strategy.indicator_cache) y, como arrays (PriceArrays), debe
+        corresponder a `prices`.
+        """
         try:
             strategy = strategy_class(**params)
+            strategy.indicator_cache = indicator_cache
             signals = strategy.generate_signals(prices)
             
-            engine = BacktestEngine(
-                initial_capital=10000,
-                costs=TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
-            )
-            result = engine.run(prices=prices, signals=signals.signals)
+            if quick:
+                stats = self._engine.quick_metrics(
+                    prices=prices, signals=signals.signals, arrays=arrays
+                )
+            else:
+                stats = self._engine.run(prices=prices, signals=signals.signals).stats
             
             return {
-                "sharpe": result.stats.get("sharpe_ratio", 0),
-                "return": result.stats.get("total_return_pct", 0) / 100,
-                "sortino": result.stats.get("sortino_ratio", 0),
+                "sharpe": stats.get("sharpe_ratio", 0),
+                "return": stats.get("total_return_pct", 0) / 100,
+                "sortino": stats.get("sortino_ratio", 0),
             }
         except Exception:
             return {"sharpe": -10, "return": -1, "sortino": -10}
     
-    def _optimize_fold(
+    def _make_scorer(
+        self,
+        train_data: pd.DataFrame,
+        strategy_class: Type[Strategy],
+    ) -> Callable[[Dict[str, Any]], float]:
+        """Crea la función que puntúa un set de parámetros en una ventana de train."""
+        # Los trials solo cambian períodos sobre los mismos precios: los
+        # indicadores ya calculados se reutilizan (un cache por ventana)
+        indicator_cache: dict = {}
+        # TPE repite combinaciones enteras (sobre todo al converger): cada
+        # combinación se evalúa una sola vez por ventana
+        seen: Dict[Tuple[Tuple[str, Any], ...], float] = {}
+        # Columnas y frecuencia de la ventana convertidas una sola vez
+        arrays = PriceArrays.from_prices(train_data)
+        
+        def score(params: Dict[str, Any]) -> float:
+            # Validar parámetros específicos de MA Cross
+            if "fast_period" in params and "slow_period" in params:
+                if params["fast_period"] >= params["slow_period"]:
+                    return -10  # Penalizar configuración inválida
+            
+            key = tuple(sorted(params.items()))
+            if key in seen:
+                return seen[key]
+            
+            metrics = self._backtest_strategy(
+                train_data, strategy_class, params,
+                quick=True, indicator_cache=indicator_cache, arrays=arrays,
+            )
+            seen[key] = metrics.get(self.metric, -10)
+            return seen[key]
+        
+        return score
+    
+    def _make_objective(
         self,
         train_data: pd.DataFrame,
         strategy_class: Type[Strategy],
         param_space: Dict[str, Tuple[int, int]],
-    ) -> Dict[str, Any]:
-        """Optimiza parámetros en una ventana con Optuna."""
+    ):
+        """Crea la función objetivo de Optuna para una ventana de train."""
+        score = self._make_scorer(train_data, strategy_class)
         
         def objective(trial: optuna.Trial) -> float:
             params = {}
@@ -156,25 +343,142 @@ class WalkForwardOptimizer:
                     params[name] = trial.suggest_int(name, low, high)
                 else:
                     params[name] = trial.suggest_float(name, low, high)
-            
-            # Validar parámetros específicos de MA Cross
-            if "fast_period" in params and "slow_period" in params:
-                if params["fast_period"] >= params["slow_period"]:
-                    return -10  # Penalizar configuración inválida
-            
-            metrics = self._backtest_strategy(train_data, strategy_class, params)
-            return metrics.get(self.metric, -10)
+            return score(params)
+        
+        return objective
+    
+    def _grid_search(
+        self,
+        train_data: pd.DataFrame,
+        strategy_class: Type[Strategy],
+        param_space: Dict[str, Tuple[int, int]],
+    ) -> Dict[str, Any]:
+        """
+        Evalúa todas las combinaciones de un espacio entero pequeño.
         
+        Solo se usa si la grilla no supera n_trials: mismo presupuesto de
+        backtests (o menos) que el sampler, pero con el óptimo exacto.
+        Empates: gana la primera combinación en orden de la grilla.
+        """
+        score = self._make_scorer(train_data, strategy_class)
+        names = list(param_space)
+        ranges = [range(low, high + 1) for low, high in param_space.values()]
+        
+        best_params: Dict[str, Any] = {}
+        best_value = -np.inf
+        for values in itertools.product(*ranges):
+            params = dict(zip(names, values))
+            value = score(params)
+            if value > best_value:
+                best_params, best_value = params, value
+        return best_params
+    
+    def _grid_size(self, param_space: Dict[str, Tuple[int, int]]) -> Optional[int]:
+        """Combinaciones del espacio si todos los rangos son enteros, si no None."""
+        if not all(
+            isinstance(low, (int, np.integer)) and isinstance(high, (int, np.integer))
+            for low, high in param_space.values()
+        ):
+            return None
+        return math.prod(max(high - low + 1, 0) for low, high in param_space.values())
+    
+    def _optimize_fold(
+        self,
+        train_data: pd.DataFrame,
+        strategy_class: Type[Strategy],
+        param_space: Dict[str, Tuple[int, int]],
+        n_jobs: int = 1,
+        prior_trials: Optional[List[FrozenTrial]] = None,
+    ) -> Tuple[Dict[str, Any], List[FrozenTrial]]:
+        """
+        Optimiza parámetros en una ventana con Optuna (o grid si el espacio es chico).
+        
+        Con n_jobs > 1 los trials se reparten entre procesos que comparten
+        un estudio en SQLite temporal (el GIL impide escalar con threads).
+        Ese camino no es reproducible (los workers ven historias distintas
+        según el orden de escritura); solo se usa con parallel_trials=True.
+        
+        Args:
+            train_data: Precios de la ventana de train.
+            strategy_class: Clase de estrategia a optimizar.
+            param_space: Rangos de parámetros.
+            n_jobs: Procesos para los trials (1 = estudio en memoria).
+            prior_trials: Trials completos de ventanas anteriores (warm-start).
+            
+        Returns:
+            Tupla (mejores parámetros, trials completos nuevos de esta ventana).
+        """
         # Suprimir logs de Optuna
         optuna.logging.set_verbosity(optuna.logging.WARNING)
         
-        study = optuna.create_study(
-            direction="maximize",
-            sampler=TPESampler(seed=42)
-        )
-        study.optimize(objective, n_trials=self.n_trials, show_progress_bar=False)
+        grid_size = self._grid_size(param_space)
+        if grid_size is not None and 0 < grid_size <= self.n_trials:
+            # La grilla completa no excede los trials pedidos: óptimo exacto
+            return self._grid_search(train_data, strategy_class, param_space), []
+        
+        prior_trials = prior_trials or []
+        if len(prior_trials) > self.MAX_PRIOR_TRIALS:
+            # Historia larga: solo los mejores trials, para acotar el loop de TPE
+            prior_trials = sorted(prior_trials, key=lambda t: t.value, reverse=True)
+            prior_trials = prior_trials[:self.PRIOR_TOP_TRIALS]
+        # Con historia suficiente TPE puede saltarse la fase aleatoria
+        n_startup_trials = 0 if len(prior_trials) >= 10 else 5
+        
+        n_workers = min(effective_n_jobs(n_jobs), self.n_trials)
+        if n_workers <= 1:
+            study = optuna.create_study(
+                direction="maximize",
+                sampler=_make_sampler(42, n_startup_trials, param_space)
+            )
+            study.add_trials(prior_trials)
+            objective = self._make_objective(train_data, strategy_class, param_space)
+            study.optimize(objective, n_trials=self.n_trials, show_progress_bar=False)
+            return self._best_new_trial(study, len(prior_trials))
         
-        return study.best_params
+        tmp_dir = tempfile.mkdtemp(prefix="wfo_")
+        storage = f"sqlite:///{os.path.join(tmp_dir, 'study.db')}"
+        study_name = f"wfo_{uuid.uuid4().hex}"
+        try:
+            study = optuna.create_study(
+                study_name=study_name,
+                storage=storage,
+                direction="maximize",
+            )
+            study.add_trials(prior_trials)
+            # Repartir n_trials exactos entre workers (semilla distinta por worker)
+            quotas = [
+                self.n_trials // n_workers + (1 if w < self.n_trials % n_workers else 0)
+                for w in range(n_workers)
+            ]
+            Parallel(n_jobs=n_workers, backend="loky")(
+                delayed(_run_trials)(
+                    self, storage, study_name, train_data, strategy_class,
+                    param_space, quota, 42 + w, n_startup_trials,
+                )
+                for w, quota in enumerate(quotas)
+            )
+            return self._best_new_trial(study, len(prior_trials))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _best_new_trial(
+        study: optuna.Study, n_prior: int
+    ) -> Tuple[Dict[str, Any], List[FrozenTrial]]:
+        """
+        Mejores parámetros y trials completos, sin los inyectados por warm-start.
+        
+        study.best_params no sirve: los trials previos se evaluaron sobre otra
+        ventana y su valor no es comparable con los de esta.
+        """
+        trials = [
+            t for t in study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+            if t.number >= n_prior
+        ]
+        if not trials:
+            raise ValueError("Ningún trial de Optuna terminó en la ventana")
+        best = max(trials, key=lambda t: t.value)
+        return best.params, trials
     
     def optimize(
         self,
@@ -198,31 +502,35 @@ class WalkForwardOptimizer:
         if len(folds_data) < 2:
             raise ValueError("Datos insuficientes para WFO. Se necesitan al menos 2 folds válidos.")
         
-        folds_results: List[WFOFold] = []
-        all_params: List[Dict[str, Any]] = []
-        
-        for i, (train_data, test_data) in enumerate(folds_data):
-            # Optimizar en train
-            best_params = self._optimize_fold(train_data, strategy_class, param_space)
-            all_params.append(best_params)
-            
-            # Evaluar en train y test
-            train_metrics = self._backtest_strategy(train_data, strategy_class, best_params)
-            test_metrics = self._backtest_strategy(test_data, strategy_class, best_params)
-            
-            fold_result = WFOFold(
-                fold_idx=i,
-                train_start=train_data.index.min(),
-                train_end=train_data.index.max(),
-                test_start=test_data.index.min(),
-                test_end=test_data.index.max(),
-                best_params=best_params,
-                train_sharpe=train_metrics["sharpe"],
-                test_sharpe=test_metrics["sharpe"],
-                train_return=train_metrics["return"],
-                test_return=test_metrics["return"],
+        total_jobs = effective_n_jobs(self.n_jobs)
+        if self.warm_start:
+            # Cada ventana parte con los trials de las anteriores: recorrido
+            # secuencial; los cores solo se usan si se piden trials paralelos
+            trial_jobs = total_jobs if self.parallel_trials else 1
+            folds_results: List[WFOFold] = []
+            prior_trials: List[FrozenTrial] = []
+            for i, (train_data, test_data) in enumerate(folds_data):
+                fold, trials = _run_fold(
+                    self, i, train_data, test_data, strategy_class, param_space,
+                    trial_jobs, prior_trials,
+                )
+                folds_results.append(fold)
+                prior_trials.extend(trials)
+        else:
+            # Cada ventana corre su propio estudio de Optuna: sin estado compartido.
+            # Con un solo worker efectivo joblib corre en este proceso (sin spawn).
+            # Los cores que sobran tras repartir ventanas van a los trials
+            # solo con parallel_trials (estudio SQLite, no determinista).
+            n_jobs = min(total_jobs, len(folds_data))
+            trial_jobs = max(1, total_jobs // n_jobs) if self.parallel_trials else 1
+            results = Parallel(n_jobs=n_jobs, backend="loky")(
+                delayed(_run_fold)(
+                    self, i, train_data, test_data, strategy_class, param_space, trial_jobs
+                )
+                for i, (train_data, test_data) in enumerate(folds_data)
             )
-            folds_results.append(fold_result)
+            folds_results = [fold for fold, _ in results]
+        all_params: List[Dict[str, Any]] = [f.best_params for f in folds_results]
         
         # Calcular métricas agregadas
         oos_sharpes = [f.test_sharpe for f in folds_results]
@@ -262,19 +570,17 @@ class WalkForwardOptimizer:
         if len(params_list) < 2:
             return 1.0
         
-        df = pd.DataFrame(params_list)
+        values = pd.DataFrame(params_list).to_numpy(dtype=np.float64)
         
-        # Calcular CV (coef. de variación) para cada parámetro
-        cvs = []
-        for col in df.columns:
-            if df[col].std() == 0:
-                cvs.append(0)  # Perfectamente estable
-            else:
-                cv = df[col].std() / (df[col].mean() + 1e-8)
-                cvs.append(cv)
+        # CV (coef. de variación) por parámetro; std muestral como pandas.
+        # std == 0 es perfectamente estable (CV 0)
+        means = values.mean(axis=0)
+        stds = values.std(axis=0, ddof=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cvs = np.where(stds == 0, 0.0, stds / (means + 1e-8))
         
         # Promedio de CVs, invertido y normalizado a 0-1
-        avg_cv = np.mean(cvs)
+        avg_cv = cvs.mean()
         stability = 1 / (1 + avg_cv)  # Transforma a 0-1
         
         return stability
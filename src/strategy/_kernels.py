@@ -0,0 +1,248 @@
+"""Kernels Numba para indicadores y señales de estrategias.
+
+Calculan medias móviles, RSI, ATR, MACD y cruces en una sola pasada sobre
+arrays float64, sin las Series intermedias (shift/fillna) de la versión pandas.
+Las fórmulas son las mismas que `rolling(n).mean()` y pandas-ta (incluido su
+manejo de NaN) para que las señales no cambien. Son los únicos kernels de
+estos indicadores: `indicators.py` y `src.ml.features` importan de aquí.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _sma_nb(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    SMA idéntica a `rolling(n).mean()` de pandas.
+
+    Replica la suma compensada (Kahan) de pandas, con compensaciones separadas
+    para altas y bajas, y su manejo de rachas de valores iguales y de signo.
+    """
+    size = x.shape[0]
+    out = np.full(size, np.nan)
+    if size == 0:
+        return out
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    nobs = 0
+    neg_ct = 0
+    same_ct = 0
+    prev_value = x[0]
+    for i in range(size):
+        if i >= n:
+            old = x[i - n]
+            if not np.isnan(old):
+                nobs -= 1
+                y = -old - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if np.signbit(old):
+                    neg_ct -= 1
+
+        value = x[i]
+        if not np.isnan(value):
+            nobs += 1
+            y = value - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if np.signbit(value):
+                neg_ct += 1
+            if value == prev_value:
+                same_ct += 1
+            else:
+                same_ct = 1
+            prev_value = value
+
+        if nobs >= n and nobs > 0:
+            result = sum_x / nobs
+            if same_ct >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+    return out
+
+
+@njit(cache=True)
+def _pairwise_sum_nb(x: np.ndarray) -> float:
+    """Suma por pares con bloques de 8, en el mismo orden que `np.add.reduce`."""
+    size = x.shape[0]
+    if size < 8:
+        total = 0.0
+        for i in range(size):
+            total += x[i]
+        return total
+    if size <= 128:
+        r = x[:8].copy()
+        i = 8
+        while i < size - (size % 8):
+            for j in range(8):
+                r[j] += x[i + j]
+            i += 8
+        total = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+        while i < size:
+            total += x[i]
+            i += 1
+        return total
+    half = size // 2
+    half -= half % 8
+    return _pairwise_sum_nb(x[:half]) + _pairwise_sum_nb(x[half:])
+
+
+@njit(cache=True)
+def _nanmean_nb(x: np.ndarray) -> float:
+    """Media ignorando NaN, bit a bit igual que `Series.mean()` (sin bottleneck)."""
+    filled = np.where(np.isnan(x), 0.0, x)
+    count = x.shape[0] - np.isnan(x).sum()
+    if count == 0:
+        return np.nan
+    return _pairwise_sum_nb(filled) / count
+
+
+@njit(cache=True)
+def _ewm_nb(x: np.ndarray, alpha: float, start: int = 0) -> np.ndarray:
+    """
+    `ewm(alpha=alpha, adjust=False).mean()` de pandas desde la barra `start`.
+
+    Con ignore_na=False: cada NaN decae el peso del valor acumulado en vez de
+    saltarse la barra. Antes de `start` (y del primer valor válido) hay NaN.
+    """
+    size = x.shape[0]
+    out = np.full(size, np.nan)
+    old_wt_factor = 1.0 - alpha
+    old_wt = 1.0
+    weighted = np.nan
+    for i in range(start, size):
+        value = x[i]
+        is_observation = not np.isnan(value)
+        if not np.isnan(weighted):
+            old_wt *= old_wt_factor
+            if is_observation:
+                # Mismo orden de operaciones que la implementación de pandas
+                if weighted != value:
+                    weighted = (old_wt * weighted + alpha * value) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = value
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True)
+def _ema_nb(x: np.ndarray, n: int) -> np.ndarray:
+    """EMA de `pandas_ta.ema` (presma): arranca desde la SMA de los primeros n."""
+    size = x.shape[0]
+    if size < n:
+        return np.full(size, np.nan)
+    seeded = x.copy()
+    seeded[n - 1] = _nanmean_nb(x[:n])
+    # alpha vía center of mass, como lo deriva pandas desde span
+    return _ewm_nb(seeded, 1.0 / (1.0 + (n - 1) / 2.0), n - 1)
+
+
+@njit(cache=True, error_model="numpy")
+def rsi_nb(close: np.ndarray, n: int) -> np.ndarray:
+    """RSI de Wilder igual que `pandas_ta.rsi` (mamode='rma'); 0/0 da NaN."""
+    size = close.shape[0]
+    gains = np.full(size, np.nan)
+    losses = np.full(size, np.nan)
+    for i in range(1, size):
+        delta = close[i] - close[i - 1]
+        if not np.isnan(delta):
+            gains[i] = delta if delta > 0 else 0.0
+            losses[i] = delta if delta < 0 else 0.0
+
+    alpha = 1.0 / n
+    avg_gain = _ewm_nb(gains, alpha)
+    avg_loss = _ewm_nb(losses, alpha)
+    return 100.0 * avg_gain / (avg_gain + np.abs(avg_loss))
+
+
+@njit(cache=True)
+def atr_nb(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int) -> np.ndarray:
+    """
+    ATR de Wilder igual que `pandas_ta.atr` (mamode='rma', presma=True).
+
+    El rango high-low suma epsilon si algún valor es cero (non_zero_range) y
+    el true range toma el máximo ignorando NaN, como `max(axis=1)`.
+    """
+    size = close.shape[0]
+    hl = high - low
+    if np.any(hl == 0.0):
+        hl = hl + np.finfo(np.float64).eps
+
+    tr = np.empty(size)
+    for i in range(size):
+        best = np.abs(hl[i])
+        if i > 0:
+            prev_close = close[i - 1]
+            for candidate in (np.abs(high[i] - prev_close), np.abs(prev_close - low[i])):
+                if np.isnan(best) or candidate > best:
+                    best = candidate
+        tr[i] = best
+
+    if n <= size:
+        tr[n - 1] = _nanmean_nb(tr[:n])
+    return _ewm_nb(tr, 1.0 / n, n - 1)
+
+
+@njit(cache=True)
+def macd_nb(close: np.ndarray, fast: int, slow: int, signal: int) -> np.ndarray:
+    """
+    MACD igual que `pandas_ta.macd`: matriz (N, 3) [MACD, histograma, señal].
+
+    La señal es la EMA (con presma) de la línea MACD desde su primer valor
+    válido (slow - 1), como hace pandas-ta con first_valid_index.
+    """
+    size = close.shape[0]
+    line = _ema_nb(close, fast) - _ema_nb(close, slow)
+    start = slow - 1
+    signal_line = np.full(size, np.nan)
+    signal_line[start:] = _ema_nb(line[start:], signal)
+
+    out = np.empty((size, 3))
+    out[:, 0] = line
+    out[:, 1] = line - signal_line
+    out[:, 2] = signal_line
+    return out
+
+
+@njit(cache=True)
+def moving_average_nb(close: np.ndarray, n: int, use_ema: bool) -> np.ndarray:
+    """SMA (`rolling(n).mean()`) o EMA (`pandas_ta.ema`) de MACrossStrategy."""
+    if use_ema:
+        return _ema_nb(close, n)
+    return _sma_nb(close, n)
+
+
+@njit(cache=True)
+def crossovers_nb(fast_ma: np.ndarray, slow_ma: np.ndarray):
+    """
+    Cruces entre la media rápida y la lenta.
+
+    Entry cuando la rápida pasa a estar sobre la lenta y exit cuando pasa a
+    estar bajo ella (la barra previa a la primera cuenta como sin cruce).
+
+    Returns:
+        Tupla (entries, exits) de arrays bool.
+    """
+    size = fast_ma.shape[0]
+    entries = np.zeros(size, dtype=np.bool_)
+    exits = np.zeros(size, dtype=np.bool_)
+    prev_above = False
+    prev_below = False
+    for i in range(size):
+        # Comparaciones con NaN son False, igual que en pandas
+        above = fast_ma[i] > slow_ma[i]
+        below = fast_ma[i] < slow_ma[i]
+        entries[i] = above and not prev_above
+        exits[i] = below and not prev_below
+        prev_above = above
+        prev_below = below
+    return entries, exits
@@ -34,8 +34,16 @@ class Strategy(ABC):
         - signals: DataFrame con columnas 'entries' y 'exits' (bool)
         - índice alineado con el DataFrame de precios de entrada
         - features: indicadores calculados (opcional, para debugging/análisis)
+    
+    Attributes:
+        indicator_cache: Dict opcional para reutilizar indicadores entre
+            instancias que reciben siempre los mismos precios (ej. los trials
+            de Optuna sobre una ventana). Quien lo asigna debe usar un dict
+            distinto por serie de precios; None desactiva el cache.
     """
 
+    indicator_cache: dict | None = None
+
     @abstractmethod
     def generate_signals(self, prices: pd.DataFrame) -> SignalResult:
         """
@@ -1,9 +1,11 @@
 """Estrategia Moving Average Crossover."""
 
+import numpy as np
 import pandas as pd
 
+from ._kernels import crossovers_nb, moving_average_nb
 from .base import Strategy, SignalResult
-from .indicators import sma
+from .indicators import ema, sma
 
 
 class MACrossStrategy(Strategy):
@@ -67,23 +69,16 @@ class MACrossStrategy(Strategy):
 
         close = prices["close"]
 
-        # Calcular medias móviles
-        if self.ma_type == "sma":
-            from .indicators import sma as ma_func
+        if self.ma_type == "ema" and len(close) < self.slow_period:
+            # pandas-ta no calcula EMA más corta que el período: usar el
+            # fallback de indicators.ema (ewm sin semilla)
+            fast_ma, slow_ma, entries, exits = self._signals_pandas(close)
         else:
-            from .indicators import ema as ma_func
-
-        fast_ma = ma_func(close, self.fast_period)
-        slow_ma = ma_func(close, self.slow_period)
-
-        # Detectar cruces
-        # Entry: fast cruza arriba de slow (fast > slow y antes fast <= slow)
-        fast_above_slow = fast_ma > slow_ma
-        entries = fast_above_slow & (~fast_above_slow.shift(1).fillna(False))
-
-        # Exit: fast cruza abajo de slow (fast < slow y antes fast >= slow)
-        fast_below_slow = fast_ma < slow_ma
-        exits = fast_below_slow & (~fast_below_slow.shift(1).fillna(False))
+            # Medias y cruces en Numba sobre el array crudo
+            close_values = close.to_numpy(dtype=np.float64)
+            fast_ma = self._moving_average(close_values, self.fast_period)
+            slow_ma = self._moving_average(close_values, self.slow_period)
+            entries, exits = crossovers_nb(fast_ma, slow_ma)
 
         # Crear DataFrame de señales
         signals = pd.DataFrame(
@@ -96,9 +91,45 @@ class MACrossStrategy(Strategy):
             {
                 f"ma_fast_{self.fast_period}": fast_ma,
                 f"ma_slow_{self.slow_period}": slow_ma,
-                "fast_above_slow": fast_above_slow,
+                "fast_above_slow": fast_ma > slow_ma,
             },
             index=prices.index,
         )
 
         return SignalResult(signals=signals, features=features)
+
+    def _moving_average(self, close: np.ndarray, period: int) -> np.ndarray:
+        """Media móvil del tipo configurado, reutilizando indicator_cache si existe."""
+        cache = self.indicator_cache
+        key = ("ma", self.ma_type, period)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None and cached.shape[0] == close.shape[0]:
+                return cached
+
+        # Mismo kernel con y sin cache: los trials de Optuna deben ver las
+        # mismas señales que la evaluación final de la ventana
+        values = moving_average_nb(close, period, self.ma_type == "ema")
+        if cache is not None:
+            # Solo lectura: el mismo array se comparte entre instancias
+            values.flags.writeable = False
+            cache[key] = values
+        return values
+
+    def _signals_pandas(
+        self, close: pd.Series
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Versión pandas de las medias y cruces (series más cortas que slow_period)."""
+        ma_func = sma if self.ma_type == "sma" else ema
+
+        fast_ma = ma_func(close, self.fast_period).to_numpy(dtype=np.float64)
+        slow_ma = ma_func(close, self.slow_period).to_numpy(dtype=np.float64)
+
+        # Entry: fast cruza arriba de slow (fast > slow y antes fast <= slow)
+        # Exit: fast cruza abajo de slow (fast < slow y antes fast >= slow)
+        # El salto 0 -> 1 de cada estado int8 marca el cruce (prepend=0: la
+        # barra previa a la primera cuenta como sin cruce)
+        entries = np.diff((fast_ma > slow_ma).view(np.int8), prepend=0) == 1
+        exits = np.diff((fast_ma < slow_ma).view(np.int8), prepend=0) == 1
+
+        return fast_ma, slow_ma, entries, exits
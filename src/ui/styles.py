@@ -1,37 +1,49 @@
 """Estilos premium para Trading Backtester Pro - Tema Dark Fintech."""
 
-css = """
-<style>
+import re
+
+_FONTS_URL = (
+    "https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700"
+    "&family=JetBrains+Mono:wght@400;500&display=swap"
+)
+
+# Fuentes vía <link> en vez de @import dentro del CSS: el browser abre las
+# conexiones y pide la hoja de fuentes en paralelo, sin esperar al <style>.
+_FONT_LINKS = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    f'<link rel="stylesheet" href="{_FONTS_URL}">'
+)
+
+# Paleta del tema. Se sustituye literal en el CSS al importar (nunca se
+# reasigna en runtime), así el browser no resuelve var() en cada recálculo.
+_CSS_VARS = {
+    "--bg-primary": "#0a0e17",
+    "--bg-secondary": "#111827",
+    "--bg-card": "rgba(17, 24, 39, 0.7)",
+    "--bg-card-hover": "rgba(30, 41, 59, 0.8)",
+    "--border-color": "rgba(99, 102, 241, 0.2)",
+    "--border-glow": "rgba(99, 102, 241, 0.4)",
+    "--text-primary": "#f8fafc",
+    "--text-secondary": "#94a3b8",
+    "--text-muted": "#64748b",
+    "--accent-primary": "#6366f1",
+    "--accent-secondary": "#8b5cf6",
+    "--accent-gradient": "linear-gradient(135deg, #6366f1 0%, #8b5cf6 50%, #a855f7 100%)",
+    "--success": "#10b981",
+    "--success-glow": "rgba(16, 185, 129, 0.3)",
+    "--danger": "#ef4444",
+    "--danger-glow": "rgba(239, 68, 68, 0.3)",
+    "--warning": "#f59e0b",
+    "--glass-bg": "rgba(15, 23, 42, 0.6)",
+    "--glass-border": "rgba(148, 163, 184, 0.1)",
+}
+
+_RAW_CSS = """
 /* ============================================
    TRADING BACKTESTER PRO - PREMIUM DARK THEME
    ============================================ */
 
-/* Import Premium Fonts */
-@import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap');
-
-/* CSS Variables for consistency */
-:root {
-    --bg-primary: #0a0e17;
-    --bg-secondary: #111827;
-    --bg-card: rgba(17, 24, 39, 0.7);
-    --bg-card-hover: rgba(30, 41, 59, 0.8);
-    --border-color: rgba(99, 102, 241, 0.2);
-    --border-glow: rgba(99, 102, 241, 0.4);
-    --text-primary: #f8fafc;
-    --text-secondary: #94a3b8;
-    --text-muted: #64748b;
-    --accent-primary: #6366f1;
-    --accent-secondary: #8b5cf6;
-    --accent-gradient: linear-gradient(135deg, #6366f1 0%, #8b5cf6 50%, #a855f7 100%);
-    --success: #10b981;
-    --success-glow: rgba(16, 185, 129, 0.3);
-    --danger: #ef4444;
-    --danger-glow: rgba(239, 68, 68, 0.3);
-    --warning: #f59e0b;
-    --glass-bg: rgba(15, 23, 42, 0.6);
-    --glass-border: rgba(148, 163, 184, 0.1);
-}
-
 /* Base Styles */
 html, body, [class*="css"] {
     font-family: 'Space Grotesk', -apple-system, BlinkMacSystemFont, sans-serif;
@@ -122,12 +134,11 @@ div[data-testid="stMetricDelta"] > div {
 /* Metric card container styling */
 div[data-testid="metric-container"] {
     background: var(--glass-bg) !important;
-    backdrop-filter: blur(12px) !important;
-    -webkit-backdrop-filter: blur(12px) !important;
     border: 1px solid var(--glass-border) !important;
     border-radius: 16px !important;
     padding: 1.5rem !important;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+    transition: transform 0.3s cubic-bezier(0.4, 0, 0.2, 1), box-shadow 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+    will-change: transform;
     box-shadow: 
         0 4px 6px -1px rgba(0, 0, 0, 0.2),
         0 2px 4px -1px rgba(0, 0, 0, 0.1),
@@ -135,7 +146,6 @@ div[data-testid="metric-container"] {
 }
 
 div[data-testid="metric-container"]:hover {
-    border-color: var(--border-glow) !important;
     transform: translateY(-2px) !important;
     box-shadow: 
         0 10px 15px -3px rgba(0, 0, 0, 0.3),
@@ -328,13 +338,12 @@ div[data-testid="metric-container"]:hover {
 /* Premium card component */
 .premium-card {
     background: var(--glass-bg);
-    backdrop-filter: blur(12px);
-    -webkit-backdrop-filter: blur(12px);
     border: 1px solid var(--glass-border);
     border-radius: 20px;
     padding: 1.5rem;
     margin-bottom: 1rem;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    transition: transform 0.3s cubic-bezier(0.4, 0, 0.2, 1), box-shadow 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    will-change: transform;
     position: relative;
     overflow: hidden;
 }
@@ -350,7 +359,6 @@ div[data-testid="metric-container"]:hover {
 }
 
 .premium-card:hover {
-    border-color: var(--border-glow);
     transform: translateY(-4px);
     box-shadow: 
         0 20px 40px -15px rgba(0, 0, 0, 0.4),
@@ -406,9 +414,49 @@ header {visibility: hidden;}
         padding: 1rem;
     }
 }
-</style>
 """
 
+# CSS sin comentarios ni espacios redundantes (ni alrededor de {}:;,>), armado
+# una sola vez: es lo que se envía al browser en cada rerun de Streamlit.
+_MIN_CSS = re.sub(r"var\((--[\w-]+)\)", lambda m: _CSS_VARS[m.group(1)], _RAW_CSS)
+_MIN_CSS = re.sub(r"/\*.*?\*/", "", _MIN_CSS, flags=re.S)
+_MIN_CSS = re.sub(r"\s+", " ", _MIN_CSS)
+_MIN_CSS = re.sub(r"\s*([{}:;,>])\s*", r"\1", _MIN_CSS).strip()
+css = f"{_FONT_LINKS}<style>{_MIN_CSS}</style>"
+
+# Color del delta según (delta_color == "inverse", delta positivo)
+_DELTA_COLORS = {
+    (False, True): "#10b981",
+    (False, False): "#ef4444",
+    (True, True): "#ef4444",
+    (True, False): "#10b981",
+}
+
+# Plantillas HTML en una sola línea para las tarjetas y headers
+_METRIC_TPL = (
+    '<div class="premium-card">'
+    '<div style="color: #94a3b8; font-size: 0.85rem; text-transform: uppercase; letter-spacing: 0.08em; margin-bottom: 0.5rem; font-weight: 500;">{label}</div>'
+    '<div style="color: #f8fafc; font-size: 2rem; font-weight: 700; font-family: JetBrains Mono, monospace; margin-bottom: 0.25rem;">{value}</div>'
+    '{delta_html}'
+    '</div>'
+)
+_SECTION_TPL = (
+    '<div style="display: flex; align-items: center; gap: 0.75rem; margin: 2rem 0 1rem 0;">'
+    '<span style="font-size: 1.5rem;">{icon}</span>'
+    '<h2 style="margin: 0; padding: 0; border: none; background: linear-gradient(135deg, #6366f1, #8b5cf6); -webkit-background-clip: text; -webkit-text-fill-color: transparent; font-size: 1.4rem; font-weight: 600;">{title}</h2>'
+    '<div style="flex: 1; height: 2px; background: linear-gradient(90deg, rgba(99, 102, 241, 0.4), transparent);"></div>'
+    '</div>'
+)
+
+
+def _emit_html(html: str) -> None:
+    """Render HTML with st.html (Streamlit >= 1.33, no Markdown pass) or fall back to st.markdown."""
+    import streamlit as st
+    if hasattr(st, "html"):
+        st.html(html)
+    else:
+        st.markdown(html, unsafe_allow_html=True)
+
 
 def apply_styles():
     """Apply premium dark theme to Streamlit app."""
@@ -426,40 +474,16 @@ def premium_metric_card(label: str, value: str, delta: str = None, delta_color:
         delta: Optional delta value
         delta_color: 'normal', 'inverse', or specific color
     """
-    import streamlit as st
-    
     delta_html = ""
     if delta:
-        color = "#10b981" if delta.startswith("+") or delta_color == "inverse" else "#ef4444"
-        if delta_color == "inverse":
-            color = "#ef4444" if delta.startswith("+") else "#10b981"
+        color = _DELTA_COLORS[(delta_color == "inverse", delta[0] == "+")]
         delta_html = f'<div style="color: {color}; font-size: 0.9rem; font-weight: 500; font-family: JetBrains Mono, monospace;">{delta}</div>'
     
-    html = f'''
-    <div class="premium-card">
-        <div style="color: #94a3b8; font-size: 0.85rem; text-transform: uppercase; letter-spacing: 0.08em; margin-bottom: 0.5rem; font-weight: 500;">
-            {label}
-        </div>
-        <div style="color: #f8fafc; font-size: 2rem; font-weight: 700; font-family: JetBrains Mono, monospace; margin-bottom: 0.25rem;">
-            {value}
-        </div>
-        {delta_html}
-    </div>
-    '''
-    st.markdown(html, unsafe_allow_html=True)
+    html = _METRIC_TPL.format_map({"label": label, "value": value, "delta_html": delta_html})
+    _emit_html(html)
 
 
 def section_header(title: str, icon: str = ""):
     """Create a styled section header."""
-    import streamlit as st
-    
-    html = f'''
-    <div style="display: flex; align-items: center; gap: 0.75rem; margin: 2rem 0 1rem 0;">
-        <span style="font-size: 1.5rem;">{icon}</span>
-        <h2 style="margin: 0; padding: 0; border: none; background: linear-gradient(135deg, #6366f1, #8b5cf6); -webkit-background-clip: text; -webkit-text-fill-color: transparent; font-size: 1.4rem; font-weight: 600;">
-            {title}
-        </h2>
-        <div style="flex: 1; height: 2px; background: linear-gradient(90deg, rgba(99, 102, 241, 0.4), transparent);"></div>
-    </div>
-    '''
-    st.markdown(html, unsafe_allow_html=True)
+    html = _SECTION_TPL.format_map({"title": title, "icon": icon})
+    _emit_html(html)
@@ -0,0 +1,14 @@
+"""Aserciones compartidas entre módulos de test."""
+
+import pandas as pd
+
+from src.strategy.base import SignalResult
+
+
+def assert_signal_result(result, prices: pd.DataFrame) -> None:
+    """Verifica el contrato de SignalResult: entries/exits con una fila por barra."""
+    assert (
+        isinstance(result, SignalResult)
+        and {"entries", "exits"} <= set(result.signals.columns)
+        and result.signals.shape[0] == len(prices)
+    )
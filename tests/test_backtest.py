@@ -1,12 +1,20 @@
 """Tests para el motor de backtesting."""
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from src.backtest.costs import TradingCosts
+from src.backtest.engine import BacktestEngine
 from src.backtest.sizing import calculate_position_size, calculate_fixed_fraction_size
 
 
+@pytest.fixture(scope="module")
+def costs():
+    """Costos 0.1% comisión + 0.05% slippage, compartidos por el módulo."""
+    return TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
+
+
 class TestTradingCosts:
     """Tests para TradingCosts."""
 
@@ -16,23 +24,20 @@ class TestTradingCosts:
         assert costs.commission_pct == 0.001
         assert costs.slippage_pct == 0.0005
 
-    def test_total_cost_pct(self):
+    def test_total_cost_pct(self, costs):
         """Costo total es entry + exit."""
-        costs = TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
         # (0.001 + 0.0005) * 2 = 0.003
         assert costs.total_cost_pct == 0.003
 
-    def test_apply_to_price_buy(self):
+    def test_apply_to_price_buy(self, costs):
         """Precio de compra se ajusta hacia arriba."""
-        costs = TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
         price = 100.0
         adjusted = costs.apply_to_price(price, is_buy=True)
         # 100 * (1 + 0.0015) = 100.15
         assert adjusted == pytest.approx(100.15)
 
-    def test_apply_to_price_sell(self):
+    def test_apply_to_price_sell(self, costs):
         """Precio de venta se ajusta hacia abajo."""
-        costs = TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
         price = 100.0
         adjusted = costs.apply_to_price(price, is_buy=False)
         # 100 * (1 - 0.0015) = 99.85
@@ -111,28 +116,42 @@ class TestPositionSizing:
             )
 
 
+# OHLCV conocido (una fila por día) para verificar precios de ejecución
+_EXECUTION_OHLCV = np.array([
+    [100, 101, 99, 100, 1000],
+    [102, 105, 101, 103, 1000],
+    [104, 106, 102, 105, 1000],
+    [103, 105, 101, 102, 1000],
+    [105, 108, 103, 106, 1000],
+    [106, 109, 104, 107, 1000],
+    [104, 107, 102, 103, 1000],
+    [107, 110, 105, 108, 1000],
+    [108, 111, 106, 109, 1000],
+    [110, 112, 108, 111, 1000],
+], dtype=np.float64)
+_EXECUTION_DATES = pd.date_range("2024-01-01", periods=10, freq="D")
+
+
 class TestExecutionPrice:
     """Tests para verificar que las órdenes se ejecutan al precio correcto (open t+1)."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_prices(self):
         """Crea datos de precio con valores conocidos para verificar ejecución."""
-        dates = pd.date_range("2024-01-01", periods=10, freq="D")
-        return pd.DataFrame({
-            "open": [100, 102, 104, 103, 105, 106, 104, 107, 108, 110],
-            "high": [101, 105, 106, 105, 108, 109, 107, 110, 111, 112],
-            "low": [99, 101, 102, 101, 103, 104, 102, 105, 106, 108],
-            "close": [100, 103, 105, 102, 106, 107, 103, 108, 109, 111],
-            "volume": [1000] * 10,
-        }, index=dates)
+        return pd.DataFrame(
+            _EXECUTION_OHLCV,
+            index=_EXECUTION_DATES,
+            columns=["open", "high", "low", "close", "volume"],
+        )
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_signals(self, sample_prices):
         """Señal de entrada en día 1, salida en día 5."""
-        signals = pd.DataFrame(index=sample_prices.index)
-        signals["entries"] = [False, True, False, False, False, False, False, False, False, False]
-        signals["exits"] = [False, False, False, False, False, True, False, False, False, False]
-        return signals
+        entries = np.zeros(len(sample_prices), dtype=bool)
+        entries[1] = True
+        exits = np.zeros(len(sample_prices), dtype=bool)
+        exits[5] = True
+        return pd.DataFrame({"entries": entries, "exits": exits}, index=sample_prices.index)
 
     def test_entry_executes_at_next_open(self, sample_prices, sample_signals):
         """
@@ -140,9 +159,6 @@ class TestExecutionPrice:
         
         Señal de entrada en día 1 (close=103) debe ejecutarse al open de día 2 (=104).
         """
-        from src.backtest.engine import BacktestEngine
-        from src.backtest.costs import TradingCosts
-        
         engine = BacktestEngine(
             initial_capital=10000,
             costs=TradingCosts(commission_pct=0, slippage_pct=0)  # Sin costos para test limpio
@@ -167,9 +183,6 @@ class TestExecutionPrice:
         
         Señal de salida en día 5 (close=107) debe ejecutarse al open de día 6 (=104).
         """
-        from src.backtest.engine import BacktestEngine
-        from src.backtest.costs import TradingCosts
-        
         engine = BacktestEngine(
             initial_capital=10000,
             costs=TradingCosts(commission_pct=0, slippage_pct=0)
@@ -186,6 +199,19 @@ class TestExecutionPrice:
             assert exit_price == pytest.approx(expected_open, rel=0.01), \
                 f"Exit price {exit_price} debería ser open del día siguiente: {expected_open}"
 
+    def test_quick_metrics_match_run(self, sample_prices, sample_signals):
+        """quick_metrics (Numba) da el mismo retorno/Sharpe/Sortino que run."""
+        engine = BacktestEngine(
+            initial_capital=10000,
+            costs=TradingCosts(commission_pct=0.001, slippage_pct=0.0005)
+        )
+        
+        stats = engine.run(prices=sample_prices, signals=sample_signals).stats
+        quick = engine.quick_metrics(prices=sample_prices, signals=sample_signals)
+        
+        for key in ("total_return_pct", "sharpe_ratio", "sortino_ratio"):
+            assert quick[key] == pytest.approx(stats[key], rel=1e-9), key
+
 
 class TestFrequencyAnnualization:
     """Tests para verificar que las métricas se annualizan correctamente según timeframe."""
@@ -222,9 +248,6 @@ class TestFrequencyAnnualization:
 
     def test_freq_inferred_from_daily_index(self):
         """Verifica que freq='1D' se infiere de índice DatetimeIndex diario."""
-        from src.backtest.engine import BacktestEngine
-        from src.backtest.costs import TradingCosts
-        
         dates = pd.date_range("2024-01-01", periods=30, freq="D")
         prices = pd.DataFrame({
             "open": range(100, 130),
@@ -247,5 +270,3 @@ class TestFrequencyAnnualization:
         # Si freq se infirió correctamente, stats debe existir
         assert "sharpe_ratio" in result.stats
         assert result.stats["sharpe_ratio"] is not None
-
-
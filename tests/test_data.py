@@ -8,8 +8,12 @@ import pandas as pd
 import pytest
 
 from src.data.cache import CacheManager
+from src.data.loader import DataLoader
 from src.data.schemas import OHLCVBar, DataMetadata
 
+# Timestamp fijo para que los tests de schemas sean deterministas
+_FIXED_TS = datetime(2024, 1, 1, 12, 0, 0)
+
 
 class TestCacheManager:
     """Tests para CacheManager."""
@@ -46,7 +50,7 @@ class TestCacheManager:
 
         # Load and compare
         loaded = cache.load_from_cache(path)
-        pd.testing.assert_frame_equal(df, loaded)
+        pd.testing.assert_frame_equal(df, loaded, check_exact=True)
 
     def test_is_cache_valid_nonexistent(self, tmp_path):
         """Caché inexistente no es válido."""
@@ -65,13 +69,57 @@ class TestCacheManager:
         assert cache.is_cache_valid(path)
 
 
+class TestDataLoaderMemCache:
+    """Tests para el caché en memoria de DataLoader."""
+
+    def test_second_load_skips_disk(self, tmp_path):
+        """Una vez cargado, el ticker se sirve desde memoria sin leer el parquet."""
+        loader = DataLoader(cache_dir=tmp_path)
+        df = pd.DataFrame(
+            {"open": [1.0], "high": [1.0], "low": [1.0], "close": [1.0], "volume": [10]},
+            index=pd.DatetimeIndex(["2024-01-02"], name="timestamp"),
+        )
+        path = loader.cache.get_cache_path("SPY", "1d")
+        loader.cache.save_to_cache(df, path)
+
+        first, _ = loader.load("SPY", "1d")
+        path.unlink()
+        second, meta = loader.load("spy", "1d")
+
+        pd.testing.assert_frame_equal(first, second)
+        assert meta.bar_count == 1
+
+    def test_clear_cache_drops_memory_copies(self, tmp_path):
+        """clear_cache limpia disco y memoria: el siguiente load no ve datos viejos."""
+        loader = DataLoader(cache_dir=tmp_path)
+        df = pd.DataFrame({"close": [1.0]})
+        for ticker in ("SPY", "QQQ"):
+            loader.cache.save_to_cache(df, loader.cache.get_cache_path(ticker, "1d"))
+            loader._put_in_mem_cache((ticker, "1d"), df)
+
+        assert loader.clear_cache("spy") == 1
+        assert loader._get_from_mem_cache(("SPY", "1d")) is None
+        assert loader._get_from_mem_cache(("QQQ", "1d")) is not None
+
+        assert loader.clear_cache() == 1
+        assert loader._get_from_mem_cache(("QQQ", "1d")) is None
+
+    def test_expired_entry_is_dropped(self, tmp_path, monkeypatch):
+        """Entradas más viejas que el TTL no se reutilizan."""
+        loader = DataLoader(cache_dir=tmp_path)
+        loader._put_in_mem_cache(("SPY", "1d"), pd.DataFrame({"close": [1.0]}))
+        monkeypatch.setattr(DataLoader, "MEM_CACHE_TTL_SECONDS", 0)
+
+        assert loader._get_from_mem_cache(("SPY", "1d")) is None
+
+
 class TestOHLCVBar:
     """Tests para OHLCVBar schema."""
 
     def test_valid_bar(self):
         """Bar válida se crea correctamente."""
         bar = OHLCVBar(
-            timestamp=datetime.now(),
+            timestamp=_FIXED_TS,
             open=100.0,
             high=105.0,
             low=98.0,
@@ -84,7 +132,7 @@ class TestOHLCVBar:
         """High < low debe fallar."""
         with pytest.raises(ValueError, match="high.*must be >= low"):
             OHLCVBar(
-                timestamp=datetime.now(),
+                timestamp=_FIXED_TS,
                 open=100.0,
                 high=95.0,  # Invalid: less than low
                 low=98.0,
@@ -96,7 +144,7 @@ class TestOHLCVBar:
         """Precios negativos deben fallar."""
         with pytest.raises(ValueError):
             OHLCVBar(
-                timestamp=datetime.now(),
+                timestamp=_FIXED_TS,
                 open=-100.0,  # Invalid
                 high=105.0,
                 low=98.0,
@@ -0,0 +1,108 @@
+"""Tests para métricas, Monte Carlo y reportes de evaluación."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from src.evaluation.metrics import (
+    calculate_calmar_ratio,
+    calculate_max_drawdown,
+    calculate_profit_factor,
+    calculate_sharpe,
+    calculate_sortino_ratio,
+    calculate_win_rate,
+)
+from src.evaluation.monte_carlo import MonteCarloSimulator
+from src.evaluation.reports import ReportGenerator, _lttb_indices
+
+
+class TestMetrics:
+    """Tests para funciones de métricas."""
+
+    def test_max_drawdown_known_value(self):
+        """Drawdown máximo desde el pico 120 hasta 90 = -25%."""
+        equity = pd.Series([100.0, 120.0, 90.0, 110.0, 130.0])
+        assert calculate_max_drawdown(equity) == pytest.approx(-25.0)
+
+    def test_max_drawdown_ignores_nan(self):
+        """Los NaN (incluso al inicio) se saltan como en cummax de pandas."""
+        equity = pd.Series([100.0, 110.0, np.nan, 90.0, 95.0, 120.0, 80.0])
+        assert calculate_max_drawdown(equity) == pytest.approx(-100.0 / 3)
+        leading = pd.Series([np.nan, 100.0, 120.0, 90.0, 110.0])
+        assert calculate_max_drawdown(leading) == pytest.approx(-25.0)
+
+    def test_max_drawdown_monotonic_is_zero(self):
+        """Equity siempre creciente no tiene drawdown."""
+        equity = pd.Series([100.0, 101.0, 102.0])
+        assert calculate_max_drawdown(equity) == 0.0
+
+    def test_sharpe_constant_returns_is_zero(self):
+        """Retornos constantes (std=0) no deben producir un Sharpe infinito."""
+        returns = pd.Series([0.01] * 50)
+        assert calculate_sharpe(returns) == 0.0
+
+    def test_sharpe_matches_pandas_with_rf(self):
+        """Sharpe con rf coincide con el cálculo de referencia en pandas."""
+        rng = np.random.default_rng(0)
+        returns = pd.Series(rng.normal(0.0005, 0.01, 500))
+        excess = returns - 0.02 / 252
+        expected = excess.mean() / excess.std() * np.sqrt(252)
+        assert calculate_sharpe(returns, rf=0.02) == pytest.approx(expected, rel=1e-9)
+
+    def test_profit_factor_and_win_rate(self):
+        """Profit factor = 30 / 10 y win rate = 2 de 3 trades."""
+        trades = pd.DataFrame({"pnl": [10.0, -10.0, 20.0]})
+        assert calculate_profit_factor(trades) == pytest.approx(3.0)
+        assert calculate_win_rate(trades) == pytest.approx(200 / 3)
+
+    def test_metrics_degenerate_inputs_return_zero(self):
+        """Series vacías o de un elemento retornan 0 sin cálculos adicionales."""
+        for series in (pd.Series([], dtype=float), pd.Series([100.0])):
+            assert calculate_sharpe(series) == 0.0
+            assert calculate_sortino_ratio(series) == 0.0
+            assert calculate_max_drawdown(series) == 0.0
+            assert calculate_calmar_ratio(series) == 0.0
+
+
+class TestMonteCarlo:
+    """Tests para MonteCarloSimulator."""
+
+    def test_paths_compound_shuffled_returns(self):
+        """Cada path termina en capital * prod(1 + r), sin importar el orden."""
+        returns = np.array([0.01, -0.02, 0.03, 0.0, 0.015, -0.01, 0.02, -0.005, 0.01, 0.004])
+        result = MonteCarloSimulator(n_simulations=50, precompile=True).simulate(
+            returns, initial_capital=1000
+        )
+
+        assert result.equity_paths.shape == (50, 11)
+        assert np.allclose(result.equity_paths[:, 0], 1000)
+        assert np.allclose(result.equity_paths[:, -1], 1000 * np.prod(1 + returns))
+
+
+class TestEquityChartDownsampling:
+    """Tests para la reducción LTTB de curvas de equity largas."""
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        """LTTB conserva extremos de la serie, primer/último punto y el tamaño pedido."""
+        values = np.sin(np.linspace(0, 20, 10_000))
+        values[4321] = -5.0  # Drawdown puntual que un stride fijo perdería
+
+        keep = _lttb_indices(values, 500)
+
+        assert keep.size == 500
+        assert keep[0] == 0 and keep[-1] == values.size - 1
+        assert np.all(np.diff(keep) > 0)
+        assert 4321 in keep
+
+    def test_long_equity_uses_webgl_with_default_args(self):
+        """Con los argumentos por defecto una curva larga se dibuja con Scattergl."""
+        dates = pd.date_range("2020-01-01", periods=5000, freq="h")
+        equity = pd.Series(10000 + np.cumsum(np.ones(5000)), index=dates)
+
+        fig = ReportGenerator().create_equity_chart(SimpleNamespace(equity=equity))
+
+        assert isinstance(fig.data[0], go.Scattergl)
+        assert len(fig.data[0].y) == 2000
@@ -1,34 +1,57 @@
 """Tests para el motor de estrategia."""
 
 from datetime import datetime, timedelta
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from src.strategy.base import Strategy, SignalResult
+from src.strategy.indicators import atr, ema, rsi, sma
 from src.strategy.ma_cross import MACrossStrategy
+from tests.helpers import assert_signal_result
 
 
-def create_test_prices(n_bars: int = 100, trend: str = "up") -> pd.DataFrame:
-    """Crea DataFrame de precios para testing."""
+@lru_cache(maxsize=None)
+def _build_prices(n_bars: int, trend: str) -> pd.DataFrame:
+    """Construye (una vez por n_bars/trend) los precios de test. No modificar."""
     dates = pd.date_range(start="2024-01-01", periods=n_bars, freq="D")
 
+    steps = np.arange(n_bars)
     if trend == "up":
-        close = [100 + i * 0.5 for i in range(n_bars)]
+        close = 100 + steps * 0.5
     elif trend == "down":
-        close = [100 - i * 0.5 for i in range(n_bars)]
+        close = 100 - steps * 0.5
     else:  # oscillating
-        close = [100 + 10 * ((-1) ** i) for i in range(n_bars)]
+        close = 100 + 10 * (-1) ** steps
 
     return pd.DataFrame({
-        "open": [c - 1 for c in close],
-        "high": [c + 2 for c in close],
-        "low": [c - 2 for c in close],
+        "open": close - 1,
+        "high": close + 2,
+        "low": close - 2,
         "close": close,
-        "volume": [10000] * n_bars,
+        "volume": np.full(n_bars, 10000, dtype=np.int64),
     }, index=dates)
 
 
+def create_test_prices(n_bars: int = 100, trend: str = "up") -> pd.DataFrame:
+    """Crea DataFrame de precios para testing (copia modificable)."""
+    return _build_prices(n_bars, trend).copy()
+
+
+@pytest.fixture(scope="module")
+def mac_prices():
+    """Precios de 100 barras compartidos por el módulo."""
+    return create_test_prices(100)
+
+
+@pytest.fixture(scope="module")
+def mac_result(mac_prices):
+    """Señales de MACross(5, 20) sobre mac_prices, calculadas una vez."""
+    return MACrossStrategy(fast_period=5, slow_period=20).generate_signals(mac_prices)
+
+
 class TestMACrossStrategy:
     """Tests para MACrossStrategy."""
 
@@ -48,33 +71,18 @@ class TestMACrossStrategy:
         with pytest.raises(ValueError, match="fast_period.*must be < slow_period"):
             MACrossStrategy(fast_period=20, slow_period=20)
 
-    def test_generate_signals_returns_correct_type(self):
+    def test_generate_signals_returns_correct_type(self, mac_prices, mac_result):
         """generate_signals retorna SignalResult."""
-        strategy = MACrossStrategy(fast_period=5, slow_period=20)
-        prices = create_test_prices(100)
-
-        result = strategy.generate_signals(prices)
-
-        assert isinstance(result, SignalResult)
-        assert "entries" in result.signals.columns
-        assert "exits" in result.signals.columns
+        assert_signal_result(mac_result, mac_prices)
 
-    def test_signals_aligned_with_prices(self):
+    def test_signals_aligned_with_prices(self, mac_prices, mac_result):
         """Señales tienen mismo índice que precios."""
-        strategy = MACrossStrategy(fast_period=5, slow_period=20)
-        prices = create_test_prices(100)
-
-        result = strategy.generate_signals(prices)
+        assert len(mac_result.signals) == len(mac_prices)
+        pd.testing.assert_index_equal(mac_result.signals.index, mac_prices.index)
 
-        assert len(result.signals) == len(prices)
-        pd.testing.assert_index_equal(result.signals.index, prices.index)
-
-    def test_features_include_moving_averages(self):
+    def test_features_include_moving_averages(self, mac_result):
         """Features incluyen MAs calculadas."""
-        strategy = MACrossStrategy(fast_period=5, slow_period=20)
-        prices = create_test_prices(100)
-
-        result = strategy.generate_signals(prices)
+        result = mac_result
 
         assert result.features is not None
         assert "ma_fast_5" in result.features.columns
@@ -102,6 +110,95 @@ class TestMACrossStrategy:
         with pytest.raises(ValueError, match="prices.*empty"):
             strategy.generate_signals(empty_prices)
 
+    @pytest.mark.parametrize("ma_type", ["sma", "ema"])
+    def test_kernel_matches_pandas_crossovers(self, ma_type):
+        """Kernel Numba da las mismas MAs y cruces que la versión pandas."""
+        rng = np.random.default_rng(0)
+        prices = create_test_prices(300)
+        prices["close"] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        strategy = MACrossStrategy(fast_period=5, slow_period=20, ma_type=ma_type)
+
+        result = strategy.generate_signals(prices)
+
+        ma_func = sma if ma_type == "sma" else ema
+        fast_ma = ma_func(prices["close"], 5)
+        slow_ma = ma_func(prices["close"], 20)
+        above = fast_ma > slow_ma
+        below = fast_ma < slow_ma
+        np.testing.assert_array_equal(result.features["ma_fast_5"], fast_ma)
+        np.testing.assert_array_equal(result.features["ma_slow_20"], slow_ma)
+        np.testing.assert_array_equal(
+            result.signals["entries"], above & ~above.shift(1, fill_value=False)
+        )
+        np.testing.assert_array_equal(
+            result.signals["exits"], below & ~below.shift(1, fill_value=False)
+        )
+
+    def test_indicator_cache_reuses_moving_averages(self):
+        """Instancias con el mismo indicator_cache comparten las MAs ya calculadas."""
+        prices = create_test_prices(200, trend="oscillating")
+        cache = {}
+
+        first = MACrossStrategy(fast_period=5, slow_period=20)
+        first.indicator_cache = cache
+        expected = first.generate_signals(prices)
+        assert ("ma", "sma", 20) in cache
+
+        second = MACrossStrategy(fast_period=10, slow_period=20)
+        second.indicator_cache = cache
+        cached_slow = cache[("ma", "sma", 20)]
+        result = second.generate_signals(prices)
+
+        assert cache[("ma", "sma", 20)] is cached_slow
+        np.testing.assert_array_equal(result.features["ma_slow_20"], cached_slow)
+        # Con y sin cache las MAs salen del mismo kernel: idénticas
+        uncached = MACrossStrategy(fast_period=5, slow_period=20).generate_signals(prices)
+        pd.testing.assert_frame_equal(expected.features, uncached.features, check_exact=True)
+        np.testing.assert_array_equal(expected.signals, uncached.signals)
+
+
+class TestIndicators:
+    """Tests para los indicadores implementados sin pandas-ta."""
+
+    @pytest.fixture
+    def close(self):
+        rng = np.random.default_rng(0)
+        dates = pd.date_range("2024-01-01", periods=300, freq="D")
+        values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        values[[50, 51, 200]] = np.nan
+        return pd.Series(values, index=dates, name="close")
+
+    def test_ema_matches_pandas_ta(self, close):
+        """EMA igual a ta.ema (~1 ulp) (semilla SMA), incluso con NaN."""
+        import pandas_ta as ta
+
+        pd.testing.assert_series_equal(
+            ema(close, 20), ta.ema(close, length=20), rtol=1e-12
+        )
+
+    def test_rsi_matches_pandas_ta(self, close):
+        """RSI igual a ta.rsi (~1 ulp) (Wilder), incluso con NaN."""
+        import pandas_ta as ta
+
+        pd.testing.assert_series_equal(
+            rsi(close, 14), ta.rsi(close, length=14), rtol=1e-12
+        )
+
+    def test_atr_matches_pandas_ta(self, close):
+        """ATR igual a ta.atr (~1 ulp); series cortas usan el fallback con rolling."""
+        import pandas_ta as ta
+
+        high, low = close * 1.01, close * 0.99
+        pd.testing.assert_series_equal(
+            atr(high, low, close, 14),
+            ta.atr(high=high, low=low, close=close, length=14),
+            rtol=1e-12,
+        )
+
+        short = atr(high[:10], low[:10], close[:10], 14)
+        assert len(short) == 10
+        assert short.isna().all()
+
 
 class TestSignalResult:
     """Tests para SignalResult."""